@@ -1,19 +1,69 @@
+import io
 import os
 import sys
 import json
-import tempfile
-from typing import List, Dict, Any
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 
-from flask import Flask, jsonify, request
+from flask import Flask, Request, Response, current_app, g, jsonify, request, stream_with_context
 from dotenv import load_dotenv
-# Removed unused import - give_description is imported from the local module
-from openai import OpenAI
 from flask_cors import CORS
 
 
-def create_app() -> Flask:
+# Backend modules load their models at import time, so they are imported
+# lazily through the model registry instead of at app creation.
+MODEL_MODULES = {
+    "general": "general_symptom_based_detection.general_conditions_backendfunction",
+    "diabetes": "diabetes.diabetes_backendfunction",
+    "skin": "skin_diseases.skin_diseases_backendfunction",
+}
+
+
+class InMemoryUploadRequest(Request):
+    """
+    Keep multipart file parts in memory instead of spooling them to temp
+    files, for the endpoints listed in IN_MEMORY_UPLOAD_ENDPOINTS only. Their
+    whole body is capped at IN_MEMORY_UPLOAD_MAX_BYTES; every other route
+    keeps the default parsing and MAX_CONTENT_LENGTH.
+    """
+
+    def _in_memory(self) -> bool:
+        return bool(current_app) and self.endpoint in current_app.config.get('IN_MEMORY_UPLOAD_ENDPOINTS', ())
+
+    @property
+    def max_content_length(self) -> Optional[int]:
+        if self._in_memory():
+            return current_app.config.get('IN_MEMORY_UPLOAD_MAX_BYTES')
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self._in_memory():
+            return io.BytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
+def create_app(warm_up: Optional[List[str]] = None) -> Flask:
+    """
+    Build the Flask app. Models load on first use; pass `warm_up` (or set
+    WARM_UP_MODELS, e.g. "general,diabetes" or "all") to load them up front.
+    """
+    startup_started = time.perf_counter()
+    startup_timings: Dict[str, float] = {}
+
+    def mark(step: str, since: float) -> float:
+        now = time.perf_counter()
+        startup_timings[step] = round(now - since, 4)
+        return now
+
     app = Flask(__name__)
 
+    # Skin image uploads stay in memory, so those request bodies are size-capped
+    app.request_class = InMemoryUploadRequest
+    app.config['IN_MEMORY_UPLOAD_ENDPOINTS'] = ('skin_predict', 'skin_predict_batch')
+    app.config['IN_MEMORY_UPLOAD_MAX_BYTES'] = int(os.getenv('SKIN_MAX_REQUEST_BYTES', str(64 * 1024 * 1024)))
+
     # Enable CORS for local dev (Vite default port)
     CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}})
 
@@ -22,34 +72,109 @@ def create_app() -> Flask:
     if backend_dir not in sys.path:
         sys.path.insert(0, backend_dir)
 
-    # Lazy imports after path setup (match new folder names)
-    from general_symptom_based_detection import general_conditions_backendfunction as gen  # type: ignore
-    from diabetes.diabetes_backendfunction import give_diabetes_prediction  # type: ignore
-    from skin_diseases.skin_diseases_backendfunction import give_skin_diseases_prediction  # type: ignore
+    from model_registry import ModelRegistry  # type: ignore
+    from app_logging import get_logger  # type: ignore
+
+    # Per-subsystem loggers (levels via LOG_LEVEL / LOG_LEVELS, see app_logging.py)
+    startup_log = get_logger('startup')
+    llm_log = get_logger('llm')
+    general_log = get_logger('general')
+    diabetes_log = get_logger('diabetes')
+    skin_log = get_logger('skin')
+
+    # Model backends are registered here and imported on first use
+    registry = ModelRegistry()
+    for model_name, module_path in MODEL_MODULES.items():
+        registry.register(model_name, module_path)
+    app.extensions['model_registry'] = registry
+
+    # Request/stage metrics, scraped from /metrics (Prometheus text format)
+    import metrics  # type: ignore
+    from metrics import stage_timer  # type: ignore
+    http_request_seconds = metrics.REGISTRY.histogram(
+        'medical_http_request_duration_seconds', 'Request latency by route', ('method', 'route', 'status'),
+    )
+    http_in_flight = metrics.REGISTRY.gauge('medical_http_requests_in_flight', 'Requests currently being handled')
+    http_errors = metrics.REGISTRY.counter(
+        'medical_http_request_errors_total', 'Responses with status >= 400, by route', ('route', 'status'),
+    )
+    llm_errors = metrics.REGISTRY.counter('medical_llm_errors_total', 'Failed LLM gateway calls', ('kind',))
+    model_load_seconds = metrics.REGISTRY.gauge('medical_model_load_seconds', 'Model import/load time', ('model',))
+    model_ready = metrics.REGISTRY.gauge('medical_model_ready', '1 once the model is loaded', ('model',))
+
+    def collect_model_metrics() -> None:
+        for name, info in registry.status().items():
+            model_ready.set(1 if info['state'] == 'ready' else 0, name)
+            if info['load_time_seconds'] is not None:
+                model_load_seconds.set(info['load_time_seconds'], name)
+    metrics.REGISTRY.add_collector('model_registry', collect_model_metrics)
+
+    def record_request(status: int) -> None:
+        if getattr(g, 'metrics_recorded', True):
+            return
+        g.metrics_recorded = True
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_seconds.observe(time.perf_counter() - g.metrics_started, request.method, route, str(status))
+        if status >= 400:
+            http_errors.inc(route, str(status))
+
+    if metrics.METRICS_ENABLED:
+        @app.before_request
+        def metrics_before_request() -> None:
+            g.metrics_started = time.perf_counter()
+            g.metrics_recorded = False
+            http_in_flight.inc()
+
+        @app.after_request
+        def metrics_after_request(response: Response) -> Response:
+            record_request(response.status_code)
+            return response
+
+        @app.teardown_request
+        def metrics_teardown_request(exc: Optional[BaseException]) -> None:
+            if not hasattr(g, 'metrics_started'):
+                return
+            if exc is not None:
+                record_request(500)
+            http_in_flight.dec()
 
     # Load environment (.env at backend root)
     load_dotenv(os.path.join(backend_dir, '.env'))
     openai_api_key = os.getenv('OPENAI_API_KEY', '')
 
-    # Initialize OpenAI client via OpenRouter when key provided
-    openai_client = None
+    llm_model = os.getenv('LLM_MODEL', 'openai/gpt-oss-20b:free')
+
+    # Initialize the async LLM gateway (OpenRouter by default) when key provided
+    step_started = time.perf_counter()
+    from general_symptom_based_detection.llm_resource.llm_gateway import (
+        LLMGateway, LLMGatewayError, LLMOverloadedError, LLMTimeoutError,
+    )  # type: ignore
+    llm_gateway = None
     if openai_api_key:
         try:
-            openai_client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=openai_api_key)
+            llm_gateway = LLMGateway(
+                api_key=openai_api_key,
+                base_url=os.getenv('LLM_BASE_URL', 'https://openrouter.ai/api/v1'),
+                model=llm_model,
+                timeout_seconds=float(os.getenv('LLM_TIMEOUT_SECONDS', '20')),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+                max_pending=int(os.getenv('LLM_MAX_PENDING', '32')),
+            )
         except Exception:
-            openai_client = None
-
-    # Preload model details and available tests
-    model_detail_path = os.path.join(backend_dir, 'general_symptom_based_detection', 'model_detail.json')
-    with open(model_detail_path, 'r', encoding='utf-8') as f:
-        model_detail = json.load(f)
-
-    condition_specific_symptoms: Dict[str, List[str]] = model_detail.get('condition_specific_symptoms', {})
-
+            llm_gateway = None
+    app.extensions['llm_gateway'] = llm_gateway
+    step_started = mark('llm_client', step_started)
 
+    # Preload model details and available tests (shared with the general backend)
+    from general_symptom_based_detection.artifact_store import get_artifact_store  # type: ignore
+    artifact_store = get_artifact_store()
+    model_detail = artifact_store.model_detail
 
 
-    uniqueness_rarity_percent = gen.get_frequency_uniqueness_rarity_percent(condition_specific_symptoms)
+    # Precomputed by make_data.py; the same dict object the follow-up engine was built with
+    def get_uniqueness_rarity_percent() -> Dict[str, Any]:
+        return artifact_store.symptom_stats()
     #     {
     #     symptom: {
     #         "frequency_percent": float,  # (count / total diseases) * 100
@@ -59,9 +184,7 @@ def create_app() -> Flask:
     # }
 
 
-    all_models_file = os.path.join(backend_dir, 'resources', 'all_disease_specific_model_details.json')
-    with open(all_models_file, 'r', encoding='utf-8') as f:
-        disease_models = json.load(f)
+    disease_models = artifact_store.disease_models
 
     available_tests: Dict[str, str] = disease_models.get('available_tests', {})
 
@@ -93,65 +216,225 @@ Rules:
 - If multiple items exist for a field, separate with commas.
 """
 
+    # Bulk diabetes scoring: rows are validated and scored this many at a time (0 = module default).
+    # bulk_scoring pulls in pandas, so it is only imported by the bulk route.
+    diabetes_bulk_chunk_size = int(os.getenv('DIABETES_BULK_CHUNK_SIZE', '0'))
+
+    # Skin uploads: decoded in memory with byte and pixel limits
+    from skin_diseases.image_ingest import ImageIngestError, load_image_from_stream  # type: ignore
+    skin_max_image_bytes = int(os.getenv('SKIN_MAX_IMAGE_BYTES', str(10 * 1024 * 1024)))
+    skin_max_image_pixels = int(os.getenv('SKIN_MAX_IMAGE_PIXELS', '24000000'))
+    skin_max_batch_files = int(os.getenv('SKIN_MAX_BATCH_FILES', '16'))
+    skin_max_top_k = int(os.getenv('SKIN_MAX_TOP_K', '6'))
+    # Decoding releases the GIL inside Pillow, so a small pool decodes batches in parallel
+    skin_decode_pool = ThreadPoolExecutor(
+        max_workers=int(os.getenv('SKIN_DECODE_WORKERS', str(min(8, os.cpu_count() or 1)))),
+        thread_name_prefix='skin-decode',
+    )
+    app.extensions['skin_decode_pool'] = skin_decode_pool
+
+    # Server-side follow-up sessions: clients send symptom deltas, get back what changed
+    from general_symptom_based_detection.diagnostic_sessions import SessionStore  # type: ignore
+    session_store = SessionStore(
+        ttl_seconds=float(os.getenv('GENERAL_SESSION_TTL_SECONDS', '1800')),
+        max_sessions=int(os.getenv('GENERAL_SESSION_MAX', '10000')),
+        max_bytes=int(os.getenv('GENERAL_SESSION_MAX_BYTES', str(64 * 1024 * 1024))),
+    )
+    session_default_top_k = int(os.getenv('GENERAL_SESSION_TOP_K', '10'))
+    app.extensions['diagnostic_sessions'] = session_store
+
+    # Disease descriptions/precautions don't need the model, so they are served
+    # from the knowledge base directly (built on first use)
+    from general_symptom_based_detection.disease_knowledge import (
+        default_description_path, default_precaution_path, get_knowledge_base,
+    )  # type: ignore
+
+    # Pluggable cache (CACHE_BACKEND): in-process, host-wide SQLite or Redis, see cache_backends.py
+    from cache_backends import artifact_version, cache_stats, get_cache, get_cache_backend  # type: ignore
+    cache_backend = get_cache_backend()
+    disease_info_cache = get_cache(
+        'general.disease_info',
+        artifact_version([default_description_path, default_precaution_path, artifact_store.disease_models_path]),
+        codec='text',
+    )
+
     # Import LLM parsing helpers
     from general_symptom_based_detection.llm_resource.llm_reply_functions import (
         parse_llm_reply_to_dict, normalize_llm_reply,
     )  # type: ignore
+    from general_symptom_based_detection.llm_resource.llm_cache import (
+        LLMReplyCache, make_cache_key,
+    )  # type: ignore
+
+    from general_symptom_based_detection.symptom_index import get_symptom_index  # type: ignore
+
+    # Local typo-tolerant symptom matcher; confident matches skip the LLM
+    symptom_index = get_symptom_index(known_symptoms_list)
+    local_match_enabled = os.getenv('LOCAL_MATCH_ENABLED', '1') != '0'
+    local_match_min_confidence = float(os.getenv('LOCAL_MATCH_MIN_CONFIDENCE', '0.85'))
+    local_match_min_coverage = float(os.getenv('LOCAL_MATCH_MIN_COVERAGE', '0.75'))
+
+    # Parsed LLM replies: in-process LRU in front of a SQLite file, or in front of
+    # the shared cache backend when one is configured
+    llm_cache = None
+    if os.getenv('LLM_CACHE_ENABLED', '1') != '0':
+        llm_cache_ttl_seconds = float(os.getenv('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+        llm_shared_cache = None
+        if cache_backend.shared:
+            # Normalized replies depend on the known symptom and test lists
+            llm_shared_cache = get_cache(
+                'llm.parse',
+                artifact_version([artifact_store.model_detail_path, artifact_store.disease_models_path]),
+                ttl_seconds=llm_cache_ttl_seconds,
+            )
+        llm_cache = LLMReplyCache(
+            db_path=None if llm_shared_cache is not None else (
+                os.getenv('LLM_CACHE_PATH', os.path.join(backend_dir, '.cache', 'llm_cache.sqlite3')) or None
+            ),
+            ttl_seconds=llm_cache_ttl_seconds,
+            max_memory_entries=int(os.getenv('LLM_CACHE_MAX_MEMORY_ENTRIES', '1024')),
+            max_disk_entries=int(os.getenv('LLM_CACHE_MAX_DISK_ENTRIES', '100000')),
+            shared=llm_shared_cache,
+        )
+
+    step_started = mark('config', step_started)
+
+    # Optional warm-up: explicit argument wins over WARM_UP_MODELS
+    if warm_up is None:
+        warm_up_env = os.getenv('WARM_UP_MODELS', '').strip()
+        if warm_up_env.lower() == 'all':
+            warm_up = registry.names()
+        else:
+            warm_up = [m.strip() for m in warm_up_env.split(',') if m.strip()]
+    warm_up_models = list(warm_up)
+    if warm_up_models:
+        registry.warm_up(warm_up_models)
+        step_started = mark('warm_up', step_started)
+
+    startup_timings['total'] = round(time.perf_counter() - startup_started, 4)
+    app.config['STARTUP_TIMINGS'] = startup_timings
+    startup_log.info("create_app timings (s): %s", startup_timings)
+    for model_name, info in registry.status().items():
+        startup_log.info("model %s: %s%s", model_name, info['state'],
+                         f" in {info['load_time_seconds']:.2f}s" if info['load_time_seconds'] is not None else "")
 
     @app.get('/api/health')
     def health() -> Any:
         return jsonify({"status": "ok"})
 
+    @app.get('/api/ready')
+    def ready() -> Any:
+        models = registry.status()
+        is_ready = all(models[m]['state'] == 'ready' for m in warm_up_models if m in models)
+        body = {
+            "ready": is_ready,
+            "warm_up_models": warm_up_models,
+            "models": models,
+            "startup_timings": startup_timings,
+        }
+        return jsonify(body), (200 if is_ready else 503)
+# {
+#   "ready": true,
+#   "warm_up_models": ["general"],
+#   "models": {
+#     "general": {"state": "ready", "load_time_seconds": 4.21, "loaded_at": 1757150000.0, "error": null},
+#     "diabetes": {"state": "not_loaded", "load_time_seconds": null, "loaded_at": null, "error": null},
+#     "skin": {"state": "not_loaded", "load_time_seconds": null, "loaded_at": null, "error": null}
+#   },
+#   "startup_timings": {"llm_client": 0.21, "config": 0.01, "warm_up": 4.21, "total": 4.45}
+# }
+
+    @app.get('/metrics')
+    def metrics_endpoint() -> Any:
+        return Response(metrics.render_metrics(), content_type=metrics.CONTENT_TYPE)
+
     @app.get('/api/tests/available')
     def get_available_tests() -> Any:
         return jsonify({"available_tests": available_tests})
 
     @app.post('/api/llm/parse')
     def llm_parse() -> Any:
-        print(f"\n\n*************************('/api/llm/parse')***************************************************************************")
         data = request.get_json(silent=True) or {}
         user_message = str(data.get('message', '')).strip()
 
         # 🖥️ Debug: log incoming request
-        print(f"[LLM_PARSE] Received user message: {user_message}")
+        llm_log.debug("/api/llm/parse received user message: %s", user_message)
 
         if not user_message:
-            print("[LLM_PARSE] Error: No message provided")
+            llm_log.info("/api/llm/parse: no message provided")
             return jsonify({"error": "message is required"}), 400
 
-        if openai_client is None:
-            print("[LLM_PARSE] Error: OpenAI client not configured")
+        # Fast path: the local index explains the message on its own
+        if local_match_enabled:
+            with stage_timer('llm_parse', 'local_match'):
+                local = symptom_index.extract(user_message)
+            found = local['symptoms_to_add'] or local['symptoms_to_removed']
+            if (found and local['confidence'] >= local_match_min_confidence
+                    and local['coverage'] >= local_match_min_coverage):
+                raw = {
+                    "symptoms_to_add": ", ".join(m['symptom'] for m in local['symptoms_to_add']),
+                    "symptoms_to_removed": ", ".join(m['symptom'] for m in local['symptoms_to_removed']),
+                    "specific_tests_to_run": "",
+                    "specific_diseases_detail": "",
+                    "invalid_input": "",
+                }
+                normalized = normalize_llm_reply(raw, known_symptoms_list, known_tests_list)
+                llm_log.debug("served by local matcher: %s", local)
+                return jsonify({"raw": raw, "normalized": normalized, "source": "local", "local_match": local})
+
+        # Identical (normalized) messages are answered from the cache without a network call
+        cache_key = make_cache_key(user_message, system_prompt, llm_model)
+        if llm_cache is not None:
+            with stage_timer('llm_parse', 'cache_lookup'):
+                cached = llm_cache.get(cache_key)
+            if cached is not None:
+                llm_log.debug("cache hit")
+                return jsonify({**cached, "source": "cache"})
+
+        if llm_gateway is None:
+            llm_log.error("OpenAI client not configured")
             return jsonify({"error": "LLM client not configured. Set OPENAI_API_KEY in .env"}), 500
 
         try:
             # 🖥️ Debug: log LLM request
-            print("[LLM_PARSE] Sending to LLM...")
+            llm_log.debug("sending to LLM")
 
-            completion = openai_client.chat.completions.create(
-                model="openai/gpt-oss-20b:free",
-                messages=[
+            with stage_timer('llm_parse', 'llm_call'):
+                ai_reply = llm_gateway.complete([
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_message},
-                ],
-            )
-            ai_reply = completion.choices[0].message.content or ""
+                ])
 
             # 🖥️ Debug: log LLM response
-            print(f"[LLM_PARSE] Raw AI reply: {ai_reply}")
-
-        except Exception as e:
-            print(f"[LLM_PARSE] LLM call failed: {str(e)}")
+            llm_log.debug("raw AI reply: %s", ai_reply)
+
+        except LLMTimeoutError as e:
+            llm_log.warning("LLM call timed out: %s", e)
+            llm_errors.inc('timeout')
+            return jsonify({"error": f"LLM call timed out: {str(e)}"}), 504
+        except LLMOverloadedError as e:
+            llm_log.warning("LLM gateway overloaded: %s", e)
+            llm_errors.inc('overloaded')
+            return jsonify({"error": f"LLM busy, try again: {str(e)}"}), 503
+        except LLMGatewayError as e:
+            llm_log.error("LLM call failed: %s", e)
+            llm_errors.inc('failed')
             return jsonify({"error": f"LLM call failed: {str(e)}"}), 502
 
         # Normalize reply to strict schema
-        raw = parse_llm_reply_to_dict(ai_reply)
-        normalized = normalize_llm_reply(raw, known_symptoms_list, known_tests_list)
+        with stage_timer('llm_parse', 'parse_normalize'):
+            raw = parse_llm_reply_to_dict(ai_reply)
+            normalized = normalize_llm_reply(raw, known_symptoms_list, known_tests_list)
 
         # 🖥️ Debug: log normalized response
-        print(f"[LLM_PARSE] Parsed raw: {raw}")
-        print(f"[LLM_PARSE] Normalized: {normalized}")
+        llm_log.debug("parsed raw: %s", raw)
+        llm_log.debug("normalized: %s", normalized)
+
+        # Only cache replies that parsed into a JSON object
+        if llm_cache is not None and raw:
+            llm_cache.set(cache_key, {"raw": raw, "normalized": normalized})
 
-        return jsonify({"raw": raw, "normalized": normalized})
+        return jsonify({"raw": raw, "normalized": normalized, "source": "llm"})
 # {
 #   "raw": {
 #     "symptoms_to_add": "high_fever",
@@ -166,20 +449,40 @@ Rules:
 #     "specific_tests_to_run": [],
 #     "specific_diseases_detail": [],
 #     "invalid_input": "",
-#   }
+#   },
+#   "source": "llm"   # or "cache" / "local" (local also returns "local_match" scores)
 # }
 
 
 
+    @app.get('/api/llm/cache_stats')
+    def llm_cache_stats() -> Any:
+        if llm_cache is None:
+            return jsonify({"enabled": False})
+        return jsonify({"enabled": True, **llm_cache.stats()})
+
+    @app.get('/api/cache_stats')
+    def shared_cache_stats() -> Any:
+        return jsonify(cache_stats())
+
+    @app.get('/api/llm/gateway_stats')
+    def llm_gateway_stats() -> Any:
+        if llm_gateway is None:
+            return jsonify({"enabled": False})
+        return jsonify({"enabled": True, **llm_gateway.stats()})
+
+
+
     @app.post('/api/general/top_predictions')
     def top_predictions() -> Any:
         data = request.get_json(silent=True) or {}
         symptoms_text = str(data.get('symptoms', '')).strip()
         if not symptoms_text:
-            print("[TOP_PREDICTIONS] Error: No symptoms provided")
+            general_log.info("/api/general/top_predictions: no symptoms provided")
             return jsonify({"error": "symptoms is required"}), 400
+        gen = registry.get('general')
         preds = gen.give_top_predictions(symptoms_text)
-        print(f"\n\n[TOP_PREDICTIONS] For symptoms: {symptoms_text}, Predictions: {preds}\n\n")
+        general_log.debug("top_predictions for symptoms %r: %s", symptoms_text, preds)
         return jsonify({"predictions": preds})
 #     [
 #     {"disease": "Flu", "confidence": 0.82},
@@ -188,6 +491,25 @@ Rules:
 # ]
 
 
+    @app.get('/api/general/inference_stats')
+    def general_inference_stats() -> Any:
+        if not registry.is_loaded('general'):
+            return jsonify({"error": "general model not loaded yet"}), 503
+        return jsonify(registry.get('general').inference_engine.get_stats())
+
+    @app.get('/api/skin/inference_stats')
+    def skin_inference_stats() -> Any:
+        if not registry.is_loaded('skin'):
+            return jsonify({"error": "skin model not loaded yet"}), 503
+        return jsonify(registry.get('skin').get_inference_stats())
+
+    @app.get('/api/general/prediction_cache_stats')
+    def general_prediction_cache_stats() -> Any:
+        if not registry.is_loaded('general'):
+            return jsonify({"error": "general model not loaded yet"}), 503
+        return jsonify(registry.get('general').get_prediction_cache_stats())
+
+
 
     @app.post('/api/general/predict')
     def predict_general() -> Any:
@@ -195,6 +517,7 @@ Rules:
         symptoms_text = str(data.get('symptoms', '')).strip()
         if not symptoms_text:
             return jsonify({"error": "symptoms is required"}), 400
+        gen = registry.get('general')
         result = gen.give_predicted_result(symptoms_text)
         # Enrich with description and recommendations if not already present
         if result and 'description' not in result:
@@ -223,8 +546,13 @@ Rules:
         if not isinstance(diseases, list) or not diseases:
             return jsonify({"error": "diseases must be a non-empty list"}), 400
 
-        # Get details for all diseases
-        results = gen.get_disease_details(diseases)
+        cache_key = hashlib.sha256(json.dumps(diseases, ensure_ascii=False).encode('utf-8')).hexdigest()
+        body = disease_info_cache.get(cache_key)
+        if body is not None:
+            return Response(body, mimetype='application/json')
+
+        # Details for all diseases, assembled from pre-serialized fragments
+        results_json = get_knowledge_base().details_json(diseases)
 
         # Suggest tests if available
         suggested_tests = []
@@ -236,10 +564,9 @@ Rules:
                     "test_name": d,
                 })
 
-        return jsonify({
-            "results": results,
-            "suggested_tests": suggested_tests
-        })
+        body = '{"results": ' + results_json + ', "suggested_tests": ' + json.dumps(suggested_tests) + '}'
+        disease_info_cache.set(cache_key, body)
+        return Response(body, mimetype='application/json')
 
 # {
 #   "results": [
@@ -273,25 +600,25 @@ Rules:
 
     @app.post('/api/general/followup')
     def generate_followup() -> Any:
-        print(f"\n\n********************************FOLLOWUP***************************************************************************************************")
         data = request.get_json(silent=True) or {}
-        print("\n[FOLLOWUP] Incoming request:", data)
+        general_log.debug("/api/general/followup incoming request: %s", data)
 
         current_symptoms = set(data.get('current_symptoms', []) or [])
         symptoms_removed = set(data.get('symptoms_removed', []) or [])
 
-        print(f"[FOLLOWUP] Current symptoms: {current_symptoms}")
-        print(f"[FOLLOWUP] Removed symptoms: {symptoms_removed}")
+        general_log.debug("followup current symptoms: %s, removed: %s", current_symptoms, symptoms_removed)
 
         # Generate top predictions
-        top_preds = gen.give_top_predictions(" ".join(list(current_symptoms)))
-        print(f"[FOLLOWUP] Top predictions: {top_preds}")
+        gen = registry.get('general')
+        # Canonical symptom names map straight to the model input (no NLP)
+        top_preds = gen.give_top_predictions(current_symptoms)
+        general_log.debug("followup top predictions: %s", top_preds)
 
         # Generate follow-up questions
         questions = gen.generate_follow_up_questions_from_all(
             all_predictions=top_preds,
             current_symptoms=current_symptoms,
-            frequency_uniqueness_rarity_percent=uniqueness_rarity_percent,
+            frequency_uniqueness_rarity_percent=get_uniqueness_rarity_percent(),
             symptoms_removed=symptoms_removed,
             max_per_disease=int(data.get('max_per_disease', 3)),
             max_total=int(data.get('max_total', 10)),
@@ -305,9 +632,110 @@ Rules:
 #     },
 #     ...
 # ]
-        print(f"[FOLLOWUP] Generated questions: {questions}\n\n\n")
+        general_log.debug("followup generated questions: %s", questions)
         return jsonify({"follow_up_questions": questions})
 
+    def session_turn_options(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "max_per_disease": int(data.get('max_per_disease', 3)),
+            "max_total": int(data.get('max_total', 10)),
+            "skip_asked": bool(data.get('skip_asked', True)),
+        }
+
+    def session_not_found(session_id: str) -> Any:
+        general_log.info("diagnostic session %s not found or expired", session_id)
+        return jsonify({"error": "session not found or expired"}), 404
+
+    @app.post('/api/general/sessions')
+    def create_session() -> Any:
+        # Same fields as /api/general/followup; later turns only send deltas
+        data = request.get_json(silent=True) or {}
+        try:
+            top_k = data.get('top_k', session_default_top_k)
+            top_k = None if top_k is None else max(1, int(top_k))
+            options = session_turn_options(data)
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_k, max_per_disease and max_total must be integers"}), 400
+
+        gen = registry.get('general')
+        session = session_store.create(top_k=top_k)
+        try:
+            with session.lock:
+                gen.apply_session_delta(
+                    session,
+                    add=data.get('current_symptoms') or None,
+                    remove=data.get('symptoms_removed') or None,
+                    **options,
+                )
+                state = gen.session_state(session)
+        except ValueError as e:
+            session_store.delete(session.session_id)
+            return jsonify({"error": str(e)}), 400
+        session_store.update_size(session)
+        state['expires_in_seconds'] = session_store.expires_in(session)
+        return jsonify(state), 201
+# {
+#     "session_id": "q3Hk...", "turn": 1,
+#     "current_symptoms": ["chills", "high_fever"], "symptoms_removed": [], "asked_symptoms": ["sweating", ...],
+#     "predictions": [{"disease": "Malaria", "confidence": 0.61}, ...],
+#     "follow_up_questions": [...],
+#     "expires_in_seconds": 1800.0
+# }
+
+    @app.post('/api/general/sessions/<session_id>/delta')
+    def session_delta(session_id: str) -> Any:
+        data = request.get_json(silent=True) or {}
+        general_log.debug("/api/general/sessions/%s/delta incoming request: %s", session_id, data)
+        session = session_store.get(session_id)
+        if session is None:
+            return session_not_found(session_id)
+        try:
+            options = session_turn_options(data)
+        except (TypeError, ValueError):
+            return jsonify({"error": "max_per_disease and max_total must be integers"}), 400
+
+        gen = registry.get('general')
+        with session.lock:
+            # A client that missed a response resynchronizes from the full state
+            expected_turn = data.get('turn')
+            if expected_turn is not None and expected_turn != session.turn:
+                state = gen.session_state(session)
+                state['error'] = "turn mismatch; full session state returned"
+                return jsonify(state), 409
+            try:
+                delta = gen.apply_session_delta(
+                    session, add=data.get('add') or None, remove=data.get('remove') or None, **options,
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        session_store.update_size(session)
+        general_log.debug("session %s delta: %s", session_id, delta)
+        return jsonify(delta)
+# {"session_id": "q3Hk...", "turn": 2, "added": ["sweating"], "removed": [],
+#  "predictions": {"changed": [{"disease": "Malaria", "confidence": 0.74, "rank": 0}], "dropped": []},
+#  "follow_up_questions": [...]}
+
+    @app.get('/api/general/sessions/<session_id>')
+    def get_session(session_id: str) -> Any:
+        session = session_store.get(session_id)
+        if session is None:
+            return session_not_found(session_id)
+        gen = registry.get('general')
+        with session.lock:
+            state = gen.session_state(session)
+        state['expires_in_seconds'] = session_store.expires_in(session)
+        return jsonify(state)
+
+    @app.delete('/api/general/sessions/<session_id>')
+    def delete_session(session_id: str) -> Any:
+        if not session_store.delete(session_id):
+            return session_not_found(session_id)
+        return '', 204
+
+    @app.get('/api/general/session_stats')
+    def general_session_stats() -> Any:
+        return jsonify(session_store.stats())
+
 
 
 
@@ -320,8 +748,7 @@ Rules:
     @app.post('/api/diabetes/predict')
     def diabetes_predict() -> Any:
         data = request.get_json(silent=True) or {}
-        print(f"\n\n*************************('/api/diabetes/predict')***************************************************************************")
-        print(f"[DIABETES_PREDICT] Incoming request data: {data}")
+        diabetes_log.debug("/api/diabetes/predict incoming request data: %s", data)
         try:
             values = [
                 float(data['pregnancies']),
@@ -335,36 +762,122 @@ Rules:
             ]
         except Exception:
             return jsonify({"error": "Invalid or missing diabetes parameters"}), 400
-        result = give_diabetes_prediction(values)
+        result = registry.get('diabetes').give_diabetes_prediction(values)
         return jsonify(result)
 
+    @app.post('/api/diabetes/predict_bulk')
+    def diabetes_predict_bulk() -> Any:
+        """
+        Score many records at once. Send a CSV shaped like dataset/diabetes.csv
+        (raw text/csv body or multipart field 'file'), or JSON: an array of
+        records or {"records": [...]}. Results stream back as NDJSON (default)
+        or CSV (?format=csv), one line per input row.
+        """
+        output_format = (request.args.get('format') or 'ndjson').lower()
+        if output_format not in ('ndjson', 'csv'):
+            return jsonify({"error": "format must be ndjson or csv"}), 400
+
+        from diabetes import bulk_scoring  # type: ignore
+        chunk_size = diabetes_bulk_chunk_size or bulk_scoring.DEFAULT_CHUNK_SIZE
+
+        content_type = (request.mimetype or '').lower()
+        try:
+            if content_type == 'application/json':
+                payload = request.get_json(silent=True)
+                records = payload.get('records') if isinstance(payload, dict) else payload
+                chunks = bulk_scoring.iter_json_chunks(records, chunk_size)
+            elif 'file' in request.files:
+                # Flask closes request.files when the view returns, before the
+                # streamed response is read; the chunk reader takes the file over
+                upload = request.files['file']
+                stream, upload.stream = upload.stream, io.BytesIO()
+                chunks = bulk_scoring.iter_csv_chunks(stream, chunk_size, close=True)
+            elif content_type in ('text/csv', 'application/csv', 'text/plain'):
+                # Raw body is read straight off the socket, chunk by chunk
+                chunks = bulk_scoring.iter_csv_chunks(request.stream, chunk_size)
+            else:
+                return jsonify({"error": "send JSON records or a CSV upload"}), 415
+        except bulk_scoring.BulkInputError as e:
+            return jsonify({"error": str(e)}), 400
+
+        diabetes = registry.get('diabetes')
+        batches = bulk_scoring.score_chunks(chunks, diabetes.give_diabetes_probabilities, diabetes.class_names)
+        if output_format == 'csv':
+            return Response(stream_with_context(bulk_scoring.to_csv(batches)), mimetype='text/csv')
+        return Response(stream_with_context(bulk_scoring.to_ndjson(batches)), mimetype='application/x-ndjson')
+
     @app.post('/api/skin/predict')
     def skin_predict() -> Any:
-        print(f"\n\n*************************('/api/skin/predict')***************************************************************************") 
         if 'file' not in request.files:
             return jsonify({"error": "file is required"}), 400
         file = request.files['file']
         if file.filename == '':
             return jsonify({"error": "empty filename"}), 400
-        tmp_path = None
+        skin = registry.get('skin')
+        try:
+            with stage_timer('skin', 'decode'):
+                img_array = load_image_from_stream(
+                    file.stream,
+                    target_size=skin.input_size,
+                    max_bytes=skin_max_image_bytes,
+                    max_pixels=skin_max_image_pixels,
+                )
+        except ImageIngestError as e:
+            return jsonify({"error": str(e)}), e.status_code
+        result = skin.give_skin_diseases_prediction_from_array(img_array)
+        skin_log.debug("/api/skin/predict result: %s", result)
+        return jsonify(result)
+
+    @app.post('/api/skin/predict_batch')
+    def skin_predict_batch() -> Any:
+        files = request.files.getlist('files') or request.files.getlist('file')
+        if not files:
+            return jsonify({"error": "files is required"}), 400
+        if len(files) > skin_max_batch_files:
+            return jsonify({"error": f"at most {skin_max_batch_files} files per request"}), 413
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1] or '.png') as tmp:
-                file.save(tmp)
-                tmp_path = tmp.name
-            result = give_skin_diseases_prediction(tmp_path)
-            print(f"\n\n\n[SKIN_PREDICT] Prediction result: {result}")
-            return jsonify(result)
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except Exception:
-                    pass
+            top_k = int(request.form.get('top_k', 3))
+        except ValueError:
+            return jsonify({"error": "top_k must be an integer"}), 400
+        top_k = max(1, min(top_k, skin_max_top_k))
+
+        skin = registry.get('skin')
+
+        def decode(file):
+            if file.filename == '':
+                raise ImageIngestError("empty filename")
+            with stage_timer('skin', 'decode'):
+                return load_image_from_stream(
+                    file.stream,
+                    target_size=skin.input_size,
+                    max_bytes=skin_max_image_bytes,
+                    max_pixels=skin_max_image_pixels,
+                )
+
+        # Decode in parallel; a bad file only fails its own slot
+        futures = [skin_decode_pool.submit(decode, f) for f in files]
+        results: List[Dict[str, Any]] = [{} for _ in files]
+        decoded_slots: List[int] = []
+        decoded_images = []
+        for i, (f, fut) in enumerate(zip(files, futures)):
+            results[i] = {"index": i, "filename": f.filename}
+            try:
+                decoded_images.append(fut.result())
+                decoded_slots.append(i)
+            except ImageIngestError as e:
+                results[i].update({"error": str(e), "status": e.status_code})
+
+        for i, prediction in zip(decoded_slots, skin.give_skin_diseases_predictions_batch(decoded_images, top_k=top_k)):
+            results[i].update(prediction)
+
+        skin_log.debug("/api/skin/predict_batch: %d/%d images predicted", len(decoded_slots), len(files))
+        return jsonify({"results": results, "count": len(files), "predicted": len(decoded_slots)})
 
     return app
 
 
 if __name__ == '__main__':
+    # Development server; for multi-process serving use serve.py
     app = create_app()
     app.run(host='127.0.0.1', port=5000, debug=True)
 
@@ -0,0 +1,147 @@
+"""
+Logging for the app and the model backends.
+
+Every subsystem logs through get_logger(name) ("app", "llm", "general",
+"diabetes", "skin", ...). Records go onto an in-process queue and are
+formatted and written by a background listener thread, so a request thread
+only pays for a level check and a queue put. Message arguments are
+formatted on the listener, never on the request thread; pass payloads as
+%-style arguments rather than f-strings.
+
+Environment:
+    LOG_LEVEL               default level for all subsystems (INFO)
+    LOG_LEVELS              per-subsystem overrides, e.g. "llm=DEBUG,general=WARNING"
+    LOG_DEBUG_SAMPLE_RATE   fraction of DEBUG records kept (1.0)
+    LOG_FORMAT              "text" (default) or "json"
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import logging.handlers
+from typing import Dict, Optional
+
+
+ROOT_LOGGER_NAME = "medical"
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues the record untouched. The stock prepare()
+    formats the message (and any large payload arguments) on the calling
+    thread; here that happens on the listener. Fine for an in-process queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = min(1.0, max(0.0, float(rate)))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+# {"ts": 1760764800.123, "level": "INFO", "logger": "medical.startup", "pid": 4121,
+#  "thread": "MainThread", "message": "create_app timings (s): {...}"}
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """"llm=DEBUG,general=WARNING" -> {"llm": 10, "general": 30}; bad entries are ignored."""
+    levels = {}
+    for part in (spec or "").split(","):
+        name, _, level = part.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if name and isinstance(logging.getLevelName(level), int):
+            levels[name] = logging.getLevelName(level)
+    return levels
+
+
+def _start_listener() -> None:
+    global _listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text").strip().lower() == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+        ))
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+    _queue_handler.queue = log_queue
+
+
+def _restart_after_fork() -> None:
+    # The listener thread doesn't survive fork(); children get their own
+    if _queue_handler is not None:
+        _start_listener()
+
+
+def configure_logging(force: bool = False) -> logging.Logger:
+    """Install the queue handler and listener once per process; safe to call repeatedly."""
+    global _queue_handler
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    with _configure_lock:
+        if _queue_handler is not None and not force:
+            return root
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+            if _listener is not None:
+                _listener.stop()
+
+        _queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(DebugSampler(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+        _start_listener()
+
+        root.addHandler(_queue_handler)
+        root.setLevel(logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").strip().upper()))
+        root.propagate = False
+        for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}").setLevel(level)
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush queued records (called at exit)."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one subsystem, e.g. get_logger("llm") -> "medical.llm"."""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
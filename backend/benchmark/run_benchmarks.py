@@ -0,0 +1,253 @@
+"""
+Microbenchmarks for the backend functions.
+
+Each benchmark cycles through inputs built from the bundled fixtures
+(general_symptom_based_detection/test/test.json, diabetes/test/test.json,
+skin_diseases/test dataset/) in a fixed order, after a warm-up, and
+reports p50/p95/p99/mean latency, throughput and peak RSS. Each benchmark
+runs in a freshly spawned process, so its peak RSS covers only the
+interpreter, the models it loads and its own run (not the benchmarks
+before it). Results are written as JSON and, when a baseline exists,
+compared against it.
+
+Usage (from the backend directory):
+    python benchmark/run_benchmarks.py
+    python benchmark/run_benchmarks.py --only give_top_predictions,get_disease_details
+    python benchmark/run_benchmarks.py --save-baseline
+    python benchmark/run_benchmarks.py --baseline benchmark/baseline.json --threshold 0.15
+
+Exit status is 1 when any benchmark's p50 or p95 is slower than the
+baseline by more than the threshold (a fraction; 0.2 = 20%).
+
+Model backends follow the usual env vars (GENERAL_MODEL_BACKEND,
+DIABETES_MODEL_BACKEND, SKIN_MODEL_BACKEND). give_top_predictions goes
+through the prediction cache like production does; set
+GENERAL_PREDICTION_CACHE_SIZE=0 to time the model on every call.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Keep benchmark output clean; request-path debug logging is off anyway at INFO
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+benchmark_dir = os.path.abspath(os.path.dirname(__file__))
+backend_dir = os.path.abspath(os.path.join(benchmark_dir, '..'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import numpy as np  # noqa: E402
+
+
+default_results_path = os.path.join(benchmark_dir, 'results.json')
+default_baseline_path = os.path.join(benchmark_dir, 'baseline.json')
+
+SEED = 1234
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def _load_json(path: str) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Each setup returns (function, list of argument tuples); imports happen here so
+# model load time stays out of the measurements.
+
+def setup_find_symptoms() -> Tuple[Callable, List[tuple]]:
+    from general_symptom_based_detection import general_conditions_backendfunction as gen
+    return gen.find_symptoms, [(s,) for s in _general_sentences(gen)]
+
+
+def setup_give_top_predictions() -> Tuple[Callable, List[tuple]]:
+    from general_symptom_based_detection import general_conditions_backendfunction as gen
+    return gen.give_top_predictions, [(s,) for s in _general_sentences(gen)]
+
+
+def setup_generate_follow_up_questions_from_all() -> Tuple[Callable, List[tuple]]:
+    from general_symptom_based_detection import general_conditions_backendfunction as gen
+    stats = gen.get_frequency_uniqueness_rarity_percent(gen.data['condition_specific_symptoms'])
+    cases = []
+    for row in _general_rows()[:100]:
+        current = {gen.data['all_symptoms'][i] for i in np.flatnonzero(row)}
+        cases.append((gen.give_top_predictions(current), current, stats))
+    return gen.generate_follow_up_questions_from_all, cases
+
+
+def setup_get_disease_details() -> Tuple[Callable, List[tuple]]:
+    from general_symptom_based_detection import general_conditions_backendfunction as gen
+    rng = random.Random(SEED)
+    diseases = list(gen.diseases_classes)
+    return gen.get_disease_details, [(rng.sample(diseases, 3),) for _ in range(100)]
+
+
+def setup_give_diabetes_prediction() -> Tuple[Callable, List[tuple]]:
+    from diabetes import diabetes_backendfunction as diabetes
+    rows = _load_json(os.path.join(backend_dir, 'diabetes', 'test', 'test.json'))['testx']
+    return diabetes.give_diabetes_prediction, [(row,) for row in rows]
+
+
+def setup_give_skin_diseases_prediction() -> Tuple[Callable, List[tuple]]:
+    from skin_diseases import skin_diseases_backendfunction as skin
+    from skin_diseases.tflite_model import list_test_images
+    images = list_test_images()
+    rng = random.Random(SEED)
+    rng.shuffle(images)
+    return skin.give_skin_diseases_prediction, [(path,) for path, _ in images[:60]]
+
+
+def _general_rows() -> List[List[int]]:
+    path = os.path.join(backend_dir, 'general_symptom_based_detection', 'test', 'test.json')
+    return _load_json(path)['testx']
+
+
+def _general_sentences(gen) -> List[str]:
+    # The model's test vectors rendered back into the free text the API receives
+    return [", ".join(gen.symptoms_classes[i] for i in np.flatnonzero(row)) for row in _general_rows()]
+
+
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable, List[tuple]]]] = {
+    'find_symptoms': setup_find_symptoms,
+    'give_top_predictions': setup_give_top_predictions,
+    'generate_follow_up_questions_from_all': setup_generate_follow_up_questions_from_all,
+    'get_disease_details': setup_get_disease_details,
+    'give_diabetes_prediction': setup_give_diabetes_prediction,
+    'give_skin_diseases_prediction': setup_give_skin_diseases_prediction,
+}
+
+
+def run_benchmark(name: str, iterations: int, warmup: int) -> Dict[str, Any]:
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+    setup_started = time.perf_counter()
+    fn, cases = BENCHMARKS[name]()
+    setup_seconds = time.perf_counter() - setup_started
+
+    for i in range(warmup):
+        fn(*cases[i % len(cases)])
+
+    latencies = np.empty(iterations, dtype=np.float64)
+    started = time.perf_counter()
+    for i in range(iterations):
+        args = cases[i % len(cases)]
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies[i] = time.perf_counter() - t0
+    wall = time.perf_counter() - started
+
+    ms = latencies * 1000.0
+    return {
+        "iterations": iterations,
+        "distinct_inputs": len(cases),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "max_ms": float(ms.max()),
+        "throughput_per_s": iterations / wall if wall > 0 else 0.0,
+        "setup_seconds": setup_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_benchmark_isolated(name: str, iterations: int, warmup: int) -> Dict[str, Any]:
+    """run_benchmark in a new interpreter (spawn, not fork, so no memory is inherited)."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_benchmark, name, iterations, warmup).result()
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "backends": {
+            var: os.getenv(var, '')
+            for var in ('GENERAL_MODEL_BACKEND', 'DIABETES_MODEL_BACKEND', 'SKIN_MODEL_BACKEND',
+                        'GENERAL_PREDICTION_CACHE_SIZE', 'GENERAL_BATCH_MAX_SIZE', 'CACHE_BACKEND')
+        },
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """One entry per benchmark present in both; 'regressed' when p50 or p95 grew past the threshold."""
+    rows = []
+    for name, current in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        changes = {}
+        for metric in ("p50_ms", "p95_ms"):
+            changes[metric] = (current[metric] / base[metric] - 1.0) if base[metric] > 0 else 0.0
+        rows.append({
+            "benchmark": name,
+            "p50_change": round(changes["p50_ms"], 4),
+            "p95_change": round(changes["p95_ms"], 4),
+            "throughput_change": round(current["throughput_per_s"] / base["throughput_per_s"] - 1.0, 4)
+            if base["throughput_per_s"] > 0 else 0.0,
+            "regressed": any(c > threshold for c in changes.values()),
+        })
+    return rows
+# [{"benchmark": "give_top_predictions", "p50_change": 0.031, "p95_change": -0.012,
+#   "throughput_change": -0.02, "regressed": false}]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backend microbenchmarks")
+    parser.add_argument('--only', default='', help="comma-separated benchmark names (default: all)")
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', default=default_results_path)
+    parser.add_argument('--baseline', default=default_baseline_path)
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown as a fraction")
+    parser.add_argument('--save-baseline', action='store_true', help="also write the results as the baseline")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(',') if n.strip()] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+
+    results: Dict[str, Any] = {"created_at": time.time(), "environment": environment_info(), "benchmarks": {}}
+    for name in names:
+        result = run_benchmark_isolated(name, args.iterations, args.warmup)
+        results["benchmarks"][name] = result
+        print(f"{name:40s} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+              f"p99 {result['p99_ms']:9.3f} ms  {result['throughput_per_s']:10.1f}/s  "
+              f"rss {result['peak_rss_mb']:.0f} MB")
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        comparison = compare_to_baseline(results, _load_json(args.baseline), args.threshold)
+        results["baseline"] = {"path": args.baseline, "threshold": args.threshold, "comparison": comparison}
+        for row in comparison:
+            flag = "REGRESSED" if row["regressed"] else "ok"
+            print(f"{row['benchmark']:40s} p50 {row['p50_change']:+.1%}  p95 {row['p95_change']:+.1%}  {flag}")
+        if any(row["regressed"] for row in comparison):
+            exit_code = 1
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,549 @@
+"""
+Pluggable cache shared by the prediction, disease-info and LLM-parse paths.
+
+A backend stores opaque bytes under string keys:
+
+    memory   in-process LRU (each worker has its own)
+    sqlite   one SQLite file shared by every worker on the host; point
+             CACHE_SQLITE_PATH at /dev/shm to keep it in shared memory
+    redis    any server speaking the Redis protocol (RESP2: GET, SET PX,
+             DEL, DBSIZE, INFO), shared across hosts
+
+Callers use get_cache(namespace, version), which returns a NamespacedCache:
+keys become "<prefix>:<namespace>:<version>:<key>" and values go through a
+codec. Versions come from artifact_version(paths), a hash of the files the
+cached values depend on, so replacing a model or a data file starts a fresh
+key space without deleting anything; stale entries age out through TTLs
+and LRU eviction.
+
+A cache never fails a request: backend errors are counted and treated as
+misses (the Redis backend also backs off for a moment after an error).
+
+Environment:
+    CACHE_BACKEND               memory | sqlite | redis (memory)
+    CACHE_KEY_PREFIX            key prefix shared by all namespaces (medical)
+    CACHE_MAX_ENTRIES           entry cap for memory / sqlite (100000)
+    CACHE_DEFAULT_TTL_SECONDS   TTL when a namespace doesn't set one (86400)
+    CACHE_SQLITE_PATH           sqlite file (backend/.cache/shared_cache.sqlite3)
+    CACHE_REDIS_URL             redis://[:password@]host:port/db (redis://127.0.0.1:6379/0)
+    CACHE_REDIS_TIMEOUT_SECONDS socket timeout (0.25)
+"""
+import io
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+backend_dir = os.path.abspath(os.path.dirname(__file__))
+default_sqlite_path = os.path.join(backend_dir, '.cache', 'shared_cache.sqlite3')
+
+
+class CacheBackend:
+    """Bytes in, bytes out. Subclasses must be safe to use from several threads."""
+
+    name = 'base'
+    # True when other worker processes see the same entries
+    shared = False
+
+    def __init__(self):
+        self._counters_lock = threading.Lock()
+        self._counters = {"evictions": 0, "expirations": 0, "errors": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def entries(self) -> Optional[int]:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {"backend": self.name, "shared": self.shared, "entries": self.entries(), **counters}
+
+
+class InProcessBackend(CacheBackend):
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 100000):
+        super().__init__()
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def entries(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Host-wide cache in a WAL-mode SQLite file. The entry cap is enforced
+    every `prune_every` writes rather than on each one.
+    """
+
+    name = 'sqlite'
+    shared = True
+
+    def __init__(self, path: str = default_sqlite_path, max_entries: int = 100000, prune_every: int = 64):
+        super().__init__()
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.prune_every = max(1, int(prune_every))
+        self._local = threading.local()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+                self._count("expirations")
+                return None
+            conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return bytes(row[0])
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), expires_at, now),
+            )
+            with self._counters_lock:
+                self._writes += 1
+                prune = self._writes % self.prune_every == 0
+            if prune:
+                self._prune(conn, now)
+            conn.commit()
+        except sqlite3.Error:
+            self._count("errors")
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+        if expired > 0:
+            self._count("expirations", expired)
+        overflow = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._count("evictions", overflow)
+
+    def delete(self, key: str) -> None:
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+        except sqlite3.Error:
+            self._count("errors")
+
+    def entries(self) -> Optional[int]:
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal RESP2 client: one blocking socket per thread (reopened after
+    fork), no pipelining. Eviction is the server's job (maxmemory-policy);
+    stats report its evicted/expired key counts when INFO provides them.
+    """
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url: str = 'redis://127.0.0.1:6379/0', timeout_seconds: float = 0.25,
+                 retry_after_seconds: float = 1.0):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int((parsed.path or '/0').lstrip('/') or 0)
+        self.timeout_seconds = float(timeout_seconds)
+        self.retry_after_seconds = float(retry_after_seconds)
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout_seconds)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn, self._local.pid = conn, os.getpid()
+            try:
+                if self.password:
+                    self._roundtrip(conn, 'AUTH', self.password)
+                if self.db:
+                    self._roundtrip(conn, 'SELECT', str(self.db))
+            except Exception:
+                self._close()
+                raise
+        return conn
+
+    def _close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _encode(*parts) -> bytes:
+        out = [b'*%d\r\n' % len(parts)]
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode('utf-8')
+            out.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(out)
+
+    def _read_reply(self, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(payload.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("connection closed by server")
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            return None if length < 0 else [self._read_reply(reader) for _ in range(length)]
+        raise RedisError(f"unexpected reply type {kind!r}")
+
+    def _roundtrip(self, conn, *parts) -> Any:
+        conn[0].sendall(self._encode(*parts))
+        return self._read_reply(conn[1])
+
+    def command(self, *parts) -> Any:
+        """Send one command; raises on connection or server errors."""
+        try:
+            return self._roundtrip(self._connection(), *parts)
+        except (OSError, ConnectionError):
+            self._close()
+            raise
+
+    def _safe_command(self, *parts) -> Any:
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.command(*parts)
+        except (OSError, ConnectionError, RedisError):
+            self._count("errors")
+            self._down_until = time.monotonic() + self.retry_after_seconds
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._safe_command('GET', key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        if ttl_seconds:
+            self._safe_command('SET', key, value, 'PX', str(int(ttl_seconds * 1000)))
+        else:
+            self._safe_command('SET', key, value)
+
+    def delete(self, key: str) -> None:
+        self._safe_command('DEL', key)
+
+    def entries(self) -> Optional[int]:
+        return self._safe_command('DBSIZE')
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        info = None
+        if time.monotonic() >= self._down_until:
+            try:
+                info = self.command('INFO', 'stats')
+            except RedisError:
+                pass  # minimal servers may not implement INFO
+            except (OSError, ConnectionError):
+                self._count("errors")
+        if isinstance(info, bytes):
+            for line in info.decode('utf-8', 'replace').splitlines():
+                name, _, value = line.partition(':')
+                if name in ('evicted_keys', 'expired_keys') and value.strip().isdigit():
+                    stats[f"server_{name}"] = int(value)
+        return stats
+
+
+# Value codecs: (encode, decode)
+def _encode_ndarray(value: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(value), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _decode_ndarray(data: bytes) -> np.ndarray:
+    value = np.load(io.BytesIO(data), allow_pickle=False)
+    value.setflags(write=False)
+    return value
+
+
+CODECS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    'json': (lambda v: json.dumps(v, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+             lambda b: json.loads(b.decode('utf-8'))),
+    'text': (lambda v: v.encode('utf-8'), lambda b: b.decode('utf-8')),
+    'ndarray': (_encode_ndarray, _decode_ndarray),
+}
+
+
+class NamespacedCache:
+    """One namespace on a backend: versioned keys, a value codec and hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, namespace: str, version: str,
+                 ttl_seconds: Optional[float] = None, codec: str = 'json', key_prefix: str = 'medical'):
+        self.backend = backend
+        self.namespace = namespace
+        self.version = str(version)
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec
+        self._encode, self._decode = CODECS[codec]
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "sets": 0, "decode_errors": 0}
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def key(self, key: str) -> str:
+        return f"{self.key_prefix}:{self.namespace}:{self.version}:{key}"
+
+    def set_version(self, version: str) -> None:
+        """Switch to a new key space (e.g. after the artifacts were replaced)."""
+        self.version = str(version)
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.backend.get(self.key(key))
+        if data is None:
+            self._count("misses")
+            return None
+        try:
+            value = self._decode(data)
+        except Exception:
+            self._count("decode_errors")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(self.key(key), self._encode(value), self.ttl_seconds)
+        self._count("sets")
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self.key(key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "namespace": self.namespace,
+            "version": self.version,
+            "codec": self.codec,
+            "ttl_seconds": self.ttl_seconds,
+            **counters,
+            "hit_ratio": (counters["hits"] / lookups) if lookups else 0.0,
+        }
+# {"namespace": "general.predictions", "version": "3f0c2a9d41b7e655", "codec": "ndarray",
+#  "ttl_seconds": 86400.0, "hits": 410, "misses": 52, "sets": 52, "decode_errors": 0, "hit_ratio": 0.887}
+
+
+_version_cache: Dict[Tuple, str] = {}
+_version_lock = threading.Lock()
+
+
+def artifact_version(paths: Iterable[str], extra: str = '') -> str:
+    """
+    Short sha256 over the contents of `paths` (missing files count as
+    absent) and `extra`. Recomputed only when a file's mtime or size changes.
+    """
+    paths = list(paths)
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    cache_key = (tuple(signature), extra)
+    with _version_lock:
+        version = _version_cache.get(cache_key)
+    if version is not None:
+        return version
+
+    digest = hashlib.sha256(extra.encode('utf-8'))
+    for path, mtime, _ in signature:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        if mtime is None:
+            digest.update(b'\0missing')
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    version = digest.hexdigest()[:16]
+    with _version_lock:
+        _version_cache[cache_key] = version
+    return version
+
+
+def create_backend(kind: Optional[str] = None) -> CacheBackend:
+    kind = (kind or os.getenv('CACHE_BACKEND', 'memory')).strip().lower()
+    max_entries = int(os.getenv('CACHE_MAX_ENTRIES', '100000'))
+    if kind == 'memory':
+        return InProcessBackend(max_entries=max_entries)
+    if kind == 'sqlite':
+        return SQLiteBackend(os.getenv('CACHE_SQLITE_PATH', default_sqlite_path), max_entries=max_entries)
+    if kind == 'redis':
+        return RedisBackend(
+            os.getenv('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/0'),
+            timeout_seconds=float(os.getenv('CACHE_REDIS_TIMEOUT_SECONDS', '0.25')),
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+
+_backend: Optional[CacheBackend] = None
+_namespaces: Dict[str, NamespacedCache] = {}
+_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Process-wide backend chosen by CACHE_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def get_cache(namespace: str, version: str, ttl_seconds: Optional[float] = None,
+              codec: str = 'json') -> NamespacedCache:
+    """The cache for one namespace; later calls with a new version switch its key space."""
+    backend = get_cache_backend()
+    with _lock:
+        cache = _namespaces.get(namespace)
+        if cache is None:
+            if ttl_seconds is None:
+                ttl_seconds = float(os.getenv('CACHE_DEFAULT_TTL_SECONDS', str(24 * 3600)))
+            cache = _namespaces[namespace] = NamespacedCache(
+                backend, namespace, version, ttl_seconds=ttl_seconds, codec=codec,
+                key_prefix=os.getenv('CACHE_KEY_PREFIX', 'medical'),
+            )
+        elif cache.version != str(version):
+            cache.set_version(version)
+    return cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _lock:
+        namespaces: List[NamespacedCache] = list(_namespaces.values())
+    return {
+        "backend": get_cache_backend().stats(),
+        "namespaces": {c.namespace: c.stats() for c in namespaces},
+    }
+# {"backend": {"backend": "sqlite", "shared": true, "entries": 1834, "evictions": 0,
+#              "expirations": 12, "errors": 0},
+#  "namespaces": {"general.predictions": {...}, "general.disease_info": {...}, "llm.parse": {...}}}
@@ -0,0 +1,177 @@
+"""
+Bulk scoring for the diabetes model.
+
+Records arrive as a CSV stream (same columns as dataset/diabetes.csv) or as
+JSON objects/arrays, are validated a chunk at a time with vectorized pandas
+operations, scored with one predict_proba call per chunk, and written back
+as NDJSON or CSV lines. Only one chunk is held in memory at a time.
+"""
+import io
+import csv
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from diabetes.features import FEATURE_COLUMNS, JSON_FIELD_ALIASES
+
+
+# Echoed back so callers can join results to their own records
+ID_COLUMNS = ("id", "Id", "ID", "patient_id")
+
+OUTPUT_FIELDS = ["row", "id", "predicted_class", "confidence", "probability_diabetes", "error"]
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+class BulkInputError(ValueError):
+    """The input as a whole can't be scored (bad header, wrong JSON shape)."""
+
+
+def _canonical(column: Any) -> str:
+    name = str(column).strip()
+    return JSON_FIELD_ALIASES.get(name, name)
+
+
+def missing_columns(columns: Iterable[str]) -> List[str]:
+    present = {_canonical(c) for c in columns}
+    return [c for c in FEATURE_COLUMNS if c not in present]
+
+
+def iter_csv_chunks(stream, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8",
+                    close: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Read a binary CSV stream chunk by chunk; the header is checked up front.
+    With `close`, the stream is closed once the chunks are exhausted (or the
+    header is rejected).
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    try:
+        reader = pd.read_csv(text, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+        first = next(reader)
+        missing = missing_columns(first.columns)
+    except (StopIteration, pd.errors.EmptyDataError):
+        _close_if(close, stream)
+        raise BulkInputError("CSV upload is empty")
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        _close_if(close, stream)
+        raise BulkInputError(f"could not parse CSV: {e}")
+    if missing:
+        _close_if(close, stream)
+        raise BulkInputError(f"CSV is missing columns: {', '.join(missing)}")
+
+    def chunks():
+        try:
+            yield first
+            for chunk in reader:
+                yield chunk
+        finally:
+            _close_if(close, stream)
+    return chunks()
+
+
+def _close_if(close: bool, stream) -> None:
+    if close:
+        stream.close()
+
+
+def iter_json_chunks(records: List[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Chunk a JSON list of records. Each record is an object keyed by the CSV
+    column names or the /api/diabetes/predict field names, or an array of
+    the 8 feature values in model order.
+    """
+    if not isinstance(records, list):
+        raise BulkInputError("expected a JSON array of records (or {\"records\": [...]})")
+
+    def chunks():
+        for start in range(0, len(records), chunk_size):
+            rows = []
+            for r in records[start:start + chunk_size]:
+                if isinstance(r, dict):
+                    rows.append(r)
+                elif isinstance(r, (list, tuple)) and len(r) == len(FEATURE_COLUMNS):
+                    rows.append(dict(zip(FEATURE_COLUMNS, r)))
+                else:
+                    rows.append({})  # reported as missing every feature
+            yield pd.DataFrame.from_records(rows)
+    return chunks()
+
+
+def validate_chunk(frame: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Vectorized validation: every feature must be a finite, non-negative number.
+    Returns the float feature matrix, a per-row valid mask and per-row errors.
+    """
+    # A feature may come under both spellings across records ("glucose" and "Glucose")
+    sources: Dict[str, List[int]] = {}
+    for pos, col in enumerate(frame.columns):
+        sources.setdefault(_canonical(col), []).append(pos)
+
+    x = np.full((len(frame), len(FEATURE_COLUMNS)), np.nan)
+    for j, col in enumerate(FEATURE_COLUMNS):
+        for pos in sources.get(col, ()):
+            values = pd.to_numeric(frame.iloc[:, pos], errors="coerce").to_numpy(dtype=np.float64)
+            x[:, j] = np.where(np.isnan(x[:, j]), values, x[:, j])
+
+    bad = ~np.isfinite(x) | (x < 0)
+    valid = ~bad.any(axis=1)
+
+    errors: List[Optional[str]] = [None] * len(frame)
+    for i in np.flatnonzero(~valid):
+        cols = [FEATURE_COLUMNS[j] for j in np.flatnonzero(bad[i])]
+        errors[i] = f"missing, non-numeric or negative: {', '.join(cols)}"
+
+    id_col = next((c for c in ID_COLUMNS if c in frame.columns), None)
+    ids = [None] * len(frame)
+    if id_col:
+        # JSON ids come back as floats when some records lack one
+        ids = [None if pd.isna(v) else int(v) if isinstance(v, float) and v.is_integer() else v
+               for v in frame[id_col].tolist()]
+    return {"x": x, "valid": valid, "errors": errors, "ids": ids}
+
+
+def score_chunks(chunks: Iterable[pd.DataFrame], predict_proba: Callable[[np.ndarray], np.ndarray],
+                 class_names: List[str]) -> Iterator[List[Dict[str, Any]]]:
+    """Yield one list of result rows per input chunk."""
+    row = 0
+    for frame in chunks:
+        checked = validate_chunk(frame)
+        valid = checked["valid"]
+        probs = predict_proba(checked["x"][valid]) if valid.any() else np.empty((0, len(class_names)))
+        best = np.argmax(probs, axis=1)
+
+        results = []
+        k = 0
+        for i in range(len(valid)):
+            out = {"row": row + i, "id": checked["ids"][i], "predicted_class": None,
+                   "confidence": None, "probability_diabetes": None, "error": checked["errors"][i]}
+            if valid[i]:
+                p = probs[k]
+                out["predicted_class"] = class_names[best[k]]
+                out["confidence"] = round(100 * float(p[best[k]]), 2)
+                out["probability_diabetes"] = round(float(p[1]), 6)
+                k += 1
+            results.append(out)
+        row += len(valid)
+        yield results
+
+
+def to_ndjson(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+    for results in batches:
+        yield "".join(json.dumps(r, default=str) + "\n" for r in results)
+# {"row": 0, "id": null, "predicted_class": "Diabetes", "confidence": 83.4, "probability_diabetes": 0.834, "error": null}
+
+
+def to_csv(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=OUTPUT_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for results in batches:
+        writer.writerows(results)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
@@ -0,0 +1,260 @@
+"""
+scikit-learn-free inference for the diabetes model.
+
+The fitted pipeline in diabetes_model.pkl (MinMaxScaler + RandomForest) is
+compiled into plain arrays in a .npz: the scaler's min_/scale_ and every
+tree's nodes flattened into shared feature/threshold/child/leaf-probability
+arrays. Logistic regression models compile to their coefficients instead.
+Rows are then scored with NumPy alone, all trees at once.
+
+Usage (from the backend directory):
+    python diabetes/compiled_model.py export
+    python diabetes/compiled_model.py check
+"""
+import os
+import sys
+import json
+import pickle
+
+import numpy as np
+
+
+model_dir = os.path.abspath(os.path.dirname(__file__))
+
+default_pkl_path = os.path.join(model_dir, 'diabetes_model.pkl')
+default_npz_path = os.path.join(model_dir, 'diabetes_model.npz')
+test_json_path = os.path.join(model_dir, 'test', 'test.json')
+dataset_csv_path = os.path.join(model_dir, 'dataset', 'diabetes.csv')
+
+# Rows scored per pass; bounds the (trees x rows) node-index matrix
+EVAL_CHUNK_ROWS = 4096
+
+
+def _split_pipeline(estimator):
+    """(scaler or None, final estimator) from a Pipeline or a bare estimator."""
+    steps = getattr(estimator, 'steps', None)
+    if not steps:
+        return None, estimator
+    transforms = [step for _, step in steps[:-1] if step is not None and step != 'passthrough']
+    if len(transforms) > 1:
+        raise ValueError(f"Only a single scaling step is supported, got {len(transforms)}")
+    return (transforms[0] if transforms else None), steps[-1][1]
+
+
+def _export_scaler(scaler, arrays):
+    if scaler is None:
+        return
+    name = type(scaler).__name__
+    if name == 'MinMaxScaler':
+        # MinMaxScaler.transform: X * scale_ + min_
+        arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+        arrays['scaler_offset'] = np.asarray(scaler.min_, dtype=np.float64)
+    elif name == 'StandardScaler':
+        scale = np.asarray(scaler.scale_ if scaler.scale_ is not None else 1.0, dtype=np.float64)
+        mean = np.asarray(scaler.mean_ if scaler.mean_ is not None else 0.0, dtype=np.float64)
+        arrays['scaler_scale'] = 1.0 / scale
+        arrays['scaler_offset'] = -mean / scale
+    else:
+        raise ValueError(f"Unsupported scaler: {name}")
+
+
+def _export_trees(trees, arrays):
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        t = tree.tree_
+        leaf = t.children_left == -1
+        node_ids = np.arange(t.node_count)
+        # Leaves point at themselves so every tree can be stepped the same number of times
+        lefts.append(np.where(leaf, node_ids, t.children_left) + offset)
+        rights.append(np.where(leaf, node_ids, t.children_right) + offset)
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(np.where(leaf, 0.0, t.threshold))
+        value = t.value[:, 0, :].astype(np.float64)
+        values.append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, int(t.max_depth))
+
+    arrays.update({
+        'kind': np.array('trees'),
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'leaf_proba': np.concatenate(values),
+        'roots': np.array(roots, dtype=np.int32),
+        'max_depth': np.array(max_depth, dtype=np.int32),
+    })
+
+
+def export_model(pkl_path=default_pkl_path, npz_path=default_npz_path):
+    """Compile the pickled estimator into a .npz. Needs scikit-learn, only here."""
+    with open(pkl_path, 'rb') as f:
+        estimator = pickle.load(f)
+    scaler, final = _split_pipeline(estimator)
+
+    arrays = {'classes': np.asarray(final.classes_)}
+    _export_scaler(scaler, arrays)
+
+    if hasattr(final, 'estimators_') and hasattr(final.estimators_[0], 'tree_'):
+        _export_trees(final.estimators_, arrays)
+    elif hasattr(final, 'tree_'):
+        _export_trees([final], arrays)
+    elif type(final).__name__ == 'LogisticRegression':
+        arrays.update({
+            'kind': np.array('logistic'),
+            'coef': np.asarray(final.coef_, dtype=np.float64),
+            'intercept': np.asarray(final.intercept_, dtype=np.float64),
+        })
+    else:
+        raise ValueError(f"Unsupported estimator: {type(final).__name__}")
+
+    np.savez(npz_path, **arrays)
+    return npz_path
+
+
+class CompiledDiabetesModel:
+    """predict_proba / predict over the arrays written by export_model."""
+
+    def __init__(self, arrays):
+        self.kind = str(arrays['kind'])
+        self.classes_ = arrays['classes']
+        self.scaler_scale = arrays['scaler_scale'] if 'scaler_scale' in arrays else None
+        self.scaler_offset = arrays['scaler_offset'] if 'scaler_offset' in arrays else None
+        if self.kind == 'trees':
+            self.feature = arrays['feature']
+            self.threshold = arrays['threshold']
+            self.left = arrays['left']
+            self.right = arrays['right']
+            self.leaf_proba = arrays['leaf_proba']
+            self.roots = arrays['roots']
+            self.max_depth = int(arrays['max_depth'])
+            self.is_leaf = self.left == np.arange(len(self.left))
+            # Interleaved (left, right) pairs: child = children[2 * node + went_right]
+            self.children = np.stack([self.left, self.right], axis=1).ravel().astype(np.int32)
+        else:
+            self.coef = arrays['coef']
+            self.intercept = arrays['intercept']
+
+    @classmethod
+    def load(cls, npz_path):
+        with np.load(npz_path, allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def _scale(self, x):
+        if self.scaler_scale is None:
+            return x
+        x = x * self.scaler_scale
+        x += self.scaler_offset
+        return x
+
+    def _tree_proba(self, x):
+        # scikit-learn trees compare float32 features against float64 thresholds
+        x = x.astype(np.float32).astype(np.float64)
+        n_rows, n_features = x.shape
+        flat_x = x.ravel()
+        # One walker per (tree, row); only walkers not yet at a leaf are stepped
+        node = np.repeat(self.roots, n_rows).astype(np.int32)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int32) * n_features, len(self.roots))
+        active = np.flatnonzero(~self.is_leaf[node]).astype(np.int32)
+        while active.size:
+            current = node[active]
+            went_right = flat_x[row_offset[active] + self.feature[current]] > self.threshold[current]
+            current = self.children[2 * current + went_right]
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+        return self.leaf_proba[node].reshape(len(self.roots), n_rows, -1).mean(axis=0)
+
+    def _logistic_proba(self, x):
+        z = x @ self.coef.T + self.intercept
+        if z.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-z[:, 0]))
+            return np.stack([1.0 - p, p], axis=1)
+        z -= z.max(axis=1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        x = self._scale(x)
+        score = self._tree_proba if self.kind == 'trees' else self._logistic_proba
+        if x.shape[0] <= EVAL_CHUNK_ROWS:
+            return score(x)
+        return np.concatenate([score(x[i:i + EVAL_CHUNK_ROWS]) for i in range(0, x.shape[0], EVAL_CHUNK_ROWS)])
+
+    def predict(self, x):
+        return self.classes_[np.argmax(self.predict_proba(x), axis=1)]
+
+
+def load_compiled_model(npz_path=default_npz_path, pkl_path=default_pkl_path, export_missing=False):
+    """
+    Load the compiled artifact. It is a build output (not committed): when it
+    is missing, fail with the command that builds it, unless `export_missing`
+    (the CLI) asks to compile it from the pickle here.
+    """
+    if not os.path.exists(npz_path):
+        if not export_missing:
+            raise FileNotFoundError(
+                f"{npz_path} not found; build it with `python diabetes/compiled_model.py export` "
+                f"from the backend directory (needs scikit-learn and {os.path.basename(pkl_path)})"
+            )
+        export_model(pkl_path, npz_path)
+    return CompiledDiabetesModel.load(npz_path)
+
+
+def check_parity(npz_path=default_npz_path, pkl_path=default_pkl_path, atol=1e-9):
+    """
+    Compare compiled outputs against the pickled scikit-learn model on
+    test/test.json and the full dataset CSV.
+    """
+    import pandas as pd
+
+    with open(test_json_path, 'r') as f:
+        test_data = json.load(f)
+    dataset = pd.read_csv(dataset_csv_path)
+    sets = {
+        "test_json": (np.array(test_data["testx"], dtype=np.float64), np.array(test_data["testy"])),
+        "dataset_csv": (dataset.drop(columns='Outcome').to_numpy(dtype=np.float64), dataset['Outcome'].to_numpy()),
+    }
+
+    compiled = load_compiled_model(npz_path, pkl_path, export_missing=True)
+    with open(pkl_path, 'rb') as f:
+        reference = pickle.load(f)
+
+    summary = {}
+    for name, (x, y) in sets.items():
+        ours = compiled.predict_proba(x)
+        theirs = reference.predict_proba(x)
+        max_abs_diff = float(np.max(np.abs(ours - theirs)))
+        summary[name] = {
+            "samples": int(len(x)),
+            "compiled_accuracy": float(np.mean(compiled.classes_[np.argmax(ours, axis=1)] == y)),
+            "sklearn_accuracy": float(np.mean(reference.classes_[np.argmax(theirs, axis=1)] == y)),
+            "max_abs_diff": max_abs_diff,
+            "argmax_agreement": float(np.mean(np.argmax(ours, axis=1) == np.argmax(theirs, axis=1))),
+            "parity": "ok" if max_abs_diff <= atol else "mismatch",
+        }
+    return summary
+# {
+#     "test_json": {"samples": 200, "compiled_accuracy": 0.87, "sklearn_accuracy": 0.87,
+#                   "max_abs_diff": 2.2e-16, "argmax_agreement": 1.0, "parity": "ok"},
+#     "dataset_csv": {"samples": 768, ..., "parity": "ok"}
+# }
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    if command == "export":
+        print(f"Compiled model written to: {export_model()}")
+    elif command == "check":
+        result = check_parity()
+        print(json.dumps(result, indent=4))
+        if any(r["parity"] == "mismatch" for r in result.values()):
+            sys.exit(1)
+    else:
+        print("usage: compiled_model.py [export|check]")
+        sys.exit(2)
@@ -2,21 +2,40 @@ import os
 import pickle
 import numpy as np
 
+from diabetes.features import FEATURE_COLUMNS
+from metrics import stage_timer
+
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 # Use path relative to this file's directory to avoid duplication
 model_path = os.path.join(os.path.dirname(__file__), 'diabetes_model.pkl')
 
-model = pickle.load(open(model_path, "rb") )  
+# sklearn (default) unpickles the pipeline; numpy scores the compiled .npz without scikit-learn
+model_backend = os.getenv('DIABETES_MODEL_BACKEND', 'sklearn').strip().lower()
+
+if model_backend == 'numpy':
+    from diabetes.compiled_model import load_compiled_model
+    model = load_compiled_model(npz_path=os.path.splitext(model_path)[0] + '.npz', pkl_path=model_path)
+elif model_backend == 'sklearn':
+    model = pickle.load(open(model_path, "rb") )  
+else:
+    raise ValueError(f"Unknown DIABETES_MODEL_BACKEND: {model_backend}")
 
 class_names=["No Diabetes","Diabetes"]
 
 def give_diabetes_prediction(inp):
-    predictions = model.predict_proba(np.array(inp).reshape(1,-1))
+    with stage_timer('diabetes', 'predict_proba'):
+        predictions = model.predict_proba(np.array(inp).reshape(1,-1))
     predicted_class = class_names[np.argmax(predictions[0])]
     confidence = round(100 * (np.max(predictions[0])), 2)
     return {"predicted_class":predicted_class, "confidence":confidence}
 
+def give_diabetes_probabilities(x):
+    """predict_proba for a (n_rows, 8) feature matrix in one call."""
+    x = np.asarray(x, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    with stage_timer('diabetes', 'predict_proba_batch'):
+        return model.predict_proba(x)
+
 
 
 # print(give_diabetes_prediction([ 12.   , 121.   ,  78.   ,  17.   ,   0.   ,  26.5  ,   0.259,
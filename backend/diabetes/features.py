@@ -0,0 +1,23 @@
+"""
+Input layout of the diabetes model, shared by the backend and bulk scoring.
+
+Kept free of pandas/scikit-learn so importing the backend stays cheap.
+"""
+
+# Model input order (matches dataset/diabetes.csv and give_diabetes_prediction)
+FEATURE_COLUMNS = [
+    "Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+    "Insulin", "BMI", "DiabetesPedigreeFunction", "Age",
+]
+
+# Field names used by /api/diabetes/predict
+JSON_FIELD_ALIASES = {
+    "pregnancies": "Pregnancies",
+    "glucose": "Glucose",
+    "blood_pressure": "BloodPressure",
+    "skin_thickness": "SkinThickness",
+    "insulin": "Insulin",
+    "bmi": "BMI",
+    "diabetes_pedigree_function": "DiabetesPedigreeFunction",
+    "age": "Age",
+}
@@ -0,0 +1,194 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+module_dir = os.path.abspath(os.path.dirname(__file__))
+backend_dir = os.path.abspath(os.path.join(module_dir, '..'))
+
+default_model_detail_path = os.path.join(module_dir, 'model_detail.json')
+default_artifacts_dir = os.path.join(module_dir, 'artifacts')
+default_dataset_path = os.path.join(module_dir, 'dataset', 'dataset.csv')
+default_disease_models_path = os.path.join(backend_dir, 'resources', 'all_disease_specific_model_details.json')
+
+# Bump when the outputs change shape/meaning so existing artifacts get rebuilt
+BUILDER_VERSION = 1
+
+# Binary artifacts written next to model_detail.json (all plain .npy, loadable with mmap)
+ARTIFACT_FILES = {
+    "symptom_names": "symptom_names.npy",                # (n_symptoms,) str, all_symptoms order
+    "disease_names": "disease_names.npy",                # (n_diseases,) str, diseases_classes order
+    "disease_symptom_matrix": "disease_symptom_matrix.npy",  # (n_diseases, n_symptoms) bool
+    "symptom_disease_count": "symptom_disease_count.npy",    # (n_symptoms,) int32
+    "symptom_frequency_percent": "symptom_frequency_percent.npy",  # (n_symptoms,) float64
+    "symptom_uniqueness": "symptom_uniqueness.npy",      # (n_symptoms,) float64, 100 if unique else 50
+}
+MANIFEST_FILE = 'manifest.json'
+
+
+def input_hash(paths=(default_dataset_path,)) -> str:
+    """sha256 over the builder version and the bytes of every input file"""
+    digest = hashlib.sha256(f"builder-v{BUILDER_VERSION}".encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(artifacts_dir: str = default_artifacts_dir) -> Optional[Dict[str, Any]]:
+    """manifest.json written by make_data.py, or None if missing or unreadable"""
+    try:
+        with open(os.path.join(artifacts_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_binary_artifacts(data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Disease×symptom matrix, name arrays and per-symptom frequency stats as arrays"""
+    diseases = data['diseases_classes']
+    symptoms = data['all_symptoms']
+    symptom_pos = {s: i for i, s in enumerate(symptoms)}
+
+    matrix = np.zeros((len(diseases), len(symptoms)), dtype=bool)
+    for row, disease in enumerate(diseases):
+        matrix[row, [symptom_pos[s] for s in data['condition_specific_symptoms'][disease]]] = True
+
+    # Same definitions as get_frequency_uniqueness_rarity_percent
+    count = matrix.sum(axis=0).astype(np.int32)
+    frequency_percent = count / max(1, len(diseases)) * 100
+    uniqueness = np.where(count == 1, 100.0, 50.0)
+
+    return {
+        "symptom_names": np.array(symptoms, dtype=str),
+        "disease_names": np.array(diseases, dtype=str),
+        "disease_symptom_matrix": matrix,
+        "symptom_disease_count": count,
+        "symptom_frequency_percent": frequency_percent,
+        "symptom_uniqueness": uniqueness,
+    }
+
+
+class ArtifactStore:
+    """
+    Read-only resources shared by app.py, the general backend and serve.py.
+
+    Each resource is loaded once per process on first use. The .npy arrays
+    written by make_data.py are memory-mapped, so workers forked from a
+    master that touched them share the same page-cache pages. dataset.csv
+    is only needed by a rare fallback and is read lazily.
+
+    The arrays are only used when artifacts/manifest.json records the
+    current builder version and the sha256 of the dataset they were built
+    from, and their symptom/disease lists match model_detail.json. Otherwise
+    they are rebuilt in memory from model_detail.json; run make_data.py to
+    regenerate the files.
+    """
+
+    def __init__(self, model_detail_path: str = default_model_detail_path,
+                 artifacts_dir: str = default_artifacts_dir,
+                 dataset_path: str = default_dataset_path,
+                 disease_models_path: str = default_disease_models_path):
+        self.model_detail_path = model_detail_path
+        self.artifacts_dir = artifacts_dir
+        self.dataset_path = dataset_path
+        self.disease_models_path = disease_models_path
+        self._resources: Dict[str, Any] = {}
+        # sha256 of the bytes each JSON resource was parsed from
+        self.digests: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self._resources.get(key)
+        if value is None:
+            with self._lock:
+                value = self._resources.get(key)
+                if value is None:
+                    value = self._resources[key] = loader()
+        return value
+
+    def _read_json(self, key: str, path: str) -> Any:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        self.digests[key] = hashlib.sha256(raw).hexdigest()
+        return json.loads(raw.decode('utf-8'))
+
+    @property
+    def model_detail(self) -> Dict[str, Any]:
+        """Parsed model_detail.json (shared; do not mutate)."""
+        return self._get('model_detail', lambda: self._read_json('model_detail', self.model_detail_path))
+
+    @property
+    def disease_models(self) -> Dict[str, Any]:
+        """Parsed resources/all_disease_specific_model_details.json (shared; do not mutate)."""
+        return self._get('disease_models', lambda: self._read_json('disease_models', self.disease_models_path))
+
+    def artifacts_current(self) -> bool:
+        """True when the manifest matches this builder and the dataset on disk"""
+        manifest = read_manifest(self.artifacts_dir)
+        if not manifest or manifest.get('builder_version') != BUILDER_VERSION:
+            return False
+        try:
+            return manifest.get('input_sha256') == input_hash([self.dataset_path])
+        except OSError:
+            return False
+
+    def _load_arrays(self) -> Dict[str, np.ndarray]:
+        paths = {key: os.path.join(self.artifacts_dir, fname) for key, fname in ARTIFACT_FILES.items()}
+        if all(os.path.exists(p) for p in paths.values()) and self.artifacts_current():
+            arrays = {key: np.asarray(np.load(p, mmap_mode='r', allow_pickle=False)) for key, p in paths.items()}
+            detail = self.model_detail
+            if (arrays['symptom_names'].tolist() == list(detail.get('all_symptoms', []))
+                    and arrays['disease_names'].tolist() == list(detail.get('diseases_classes', []))):
+                return arrays
+        return build_binary_artifacts(self.model_detail)
+
+    def array(self, name: str) -> np.ndarray:
+        """One of ARTIFACT_FILES, e.g. "disease_symptom_matrix" (read-only)."""
+        return self._get('arrays', self._load_arrays)[name]
+
+    def symptom_stats(self) -> Dict[str, Dict[str, float]]:
+        """Same dict as get_frequency_uniqueness_rarity_percent, from the precomputed arrays."""
+        def build():
+            names = self.array('symptom_names').tolist()
+            frequency = self.array('symptom_frequency_percent').tolist()
+            uniqueness = self.array('symptom_uniqueness').tolist()
+            return {
+                name: {"frequency_percent": freq, "rarity_percent": 100 - freq, "uniqueness": int(uniq)}
+                for name, freq, uniq in zip(names, frequency, uniqueness)
+            }
+        return self._get('symptom_stats', build)
+    # {"itching": {"frequency_percent": 14.63, "rarity_percent": 85.37, "uniqueness": 50}, ...}
+
+    def dataset(self):
+        """dataset.csv as a DataFrame, read on first call."""
+        def load():
+            import pandas as pd
+            return pd.read_csv(self.dataset_path)
+        return self._get('dataset', load)
+
+    def preload(self) -> List[str]:
+        """Load everything the request path uses (not the dataset); returns what was loaded."""
+        self.model_detail
+        self.disease_models
+        self.symptom_stats()
+        return sorted(self._resources)
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Shared store for the bundled artifacts."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
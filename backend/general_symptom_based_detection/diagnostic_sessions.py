@@ -0,0 +1,190 @@
+import time
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# Rough per-session bookkeeping cost (object, masks, lock, dict slot); the
+# store adds the prediction vector and the cached response lists on top.
+SESSION_BASE_BYTES = 1024
+PREDICTION_ENTRY_BYTES = 96
+QUESTION_ENTRY_BYTES = 384
+
+
+class DiagnosticSession:
+    """
+    Server-side state of one symptom-checker conversation.
+
+    Symptom sets are bitmasks over the model's input positions (bit i is
+    all_symptoms[i]), like the prediction cache keys. `predictions` is the
+    model output for `predictions_mask`; `last_predictions` and
+    `last_questions` are what the client was last sent, so a turn can
+    return only what changed.
+    """
+
+    __slots__ = ("session_id", "created_at", "last_access", "turn", "top_k",
+                 "symptom_mask", "removed_mask", "asked_mask",
+                 "predictions", "predictions_mask", "last_predictions", "last_questions",
+                 "size_bytes", "lock")
+
+    def __init__(self, session_id: str, top_k: Optional[int] = None):
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_access = time.monotonic()
+        self.turn = 0
+        self.top_k = top_k
+        self.symptom_mask = 0
+        self.removed_mask = 0
+        self.asked_mask = 0
+        self.predictions: Optional[np.ndarray] = None
+        self.predictions_mask = 0
+        self.last_predictions: List[Dict[str, Any]] = []
+        self.last_questions: List[Dict[str, Any]] = []
+        self.size_bytes = SESSION_BASE_BYTES
+        # Turns on one session are applied one at a time
+        self.lock = threading.Lock()
+
+    def estimate_size(self) -> int:
+        size = SESSION_BASE_BYTES
+        if self.predictions is not None:
+            size += self.predictions.nbytes
+        size += PREDICTION_ENTRY_BYTES * len(self.last_predictions)
+        size += QUESTION_ENTRY_BYTES * len(self.last_questions)
+        return size
+
+
+class SessionStore:
+    """
+    In-process store of DiagnosticSession objects.
+
+    Sessions expire `ttl_seconds` after their last use. Beyond `max_sessions`
+    sessions or `max_bytes` of estimated state, the least recently used
+    sessions are evicted. Expired sessions are dropped as the store is used
+    (they sit at the old end of the LRU order), so no sweeper thread is
+    needed.
+
+    The store is per process: under serve.py with several workers, clients
+    need sticky routing, or must recreate the session (with its full state)
+    when a turn answers 404.
+    """
+
+    def __init__(self, ttl_seconds: float = 1800.0, max_sessions: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_bytes = max(0, int(max_bytes))
+
+        self._sessions: "OrderedDict[str, DiagnosticSession]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access < self.ttl_seconds:
+                break
+            self._drop(session.session_id)
+            self.expired += 1
+
+    def _drop(self, session_id: str) -> Optional[DiagnosticSession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session.size_bytes
+        return session
+
+    def _enforce_limits(self, keep: str) -> None:
+        while self._sessions and (len(self._sessions) > self.max_sessions
+                                  or (self.max_bytes and self._bytes > self.max_bytes)):
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.evicted += 1
+
+    def create(self, top_k: Optional[int] = None) -> DiagnosticSession:
+        session = DiagnosticSession(secrets.token_urlsafe(16), top_k=top_k)
+        with self._lock:
+            self._expire(session.last_access)
+            self._sessions[session.session_id] = session
+            self._bytes += session.size_bytes
+            self.created += 1
+            self._enforce_limits(keep=session.session_id)
+        return session
+
+    def get(self, session_id: str) -> Optional[DiagnosticSession]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                self.misses += 1
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return session
+
+    def update_size(self, session: DiagnosticSession) -> None:
+        """Re-account a session after a turn changed its state (may evict others)."""
+        size = session.estimate_size()
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return  # expired or evicted mid-turn
+            self._bytes += size - session.size_bytes
+            session.size_bytes = size
+            self._enforce_limits(keep=session.session_id)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._drop(session_id) is not None
+
+    def expires_in(self, session: DiagnosticSession) -> float:
+        return max(0.0, self.ttl_seconds - (time.monotonic() - session.last_access))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+# {"sessions": 37, "max_sessions": 10000, "bytes": 61440, "max_bytes": 67108864,
+#  "ttl_seconds": 1800.0, "created": 52, "expired": 15, "evicted": 0, "hits": 311, "misses": 2}
+
+
+def diff_predictions(previous: List[Dict[str, Any]], current: List[Dict[str, Any]],
+                     tolerance: float = 1e-6) -> Optional[Dict[str, Any]]:
+    """
+    What changed between two ranked prediction lists, or None if nothing did.
+    "changed" holds new or re-scored entries (with their rank in `current`),
+    "dropped" the diseases no longer listed.
+    """
+    before = {p["disease"]: (i, p["confidence"]) for i, p in enumerate(previous)}
+    changed = []
+    for rank, pred in enumerate(current):
+        old = before.pop(pred["disease"], None)
+        if old is None or old[0] != rank or abs(old[1] - pred["confidence"]) > tolerance:
+            changed.append({"disease": pred["disease"], "confidence": pred["confidence"], "rank": rank})
+    if not changed and not before:
+        return None
+    return {"changed": changed, "dropped": list(before)}
+# {"changed": [{"disease": "Malaria", "confidence": 0.61, "rank": 0},
+#              {"disease": "Dengue", "confidence": 0.22, "rank": 1}],
+#  "dropped": ["Typhoid"]}
@@ -0,0 +1,124 @@
+import os
+import csv
+import json
+import threading
+from types import MappingProxyType
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+dataset_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'dataset')
+
+default_description_path = os.path.join(dataset_dir, 'symptom_Description.csv')
+default_precaution_path = os.path.join(dataset_dir, 'symptom_precaution.csv')
+
+
+class DiseaseInfo(NamedTuple):
+    description: str
+    recommendations: Tuple[str, ...]
+    # Pre-serialized '"description": ..., "recommendations": [...]' body
+    json_fragment: str
+
+
+def _json_fragment(description: str, recommendations) -> str:
+    return (
+        '"description": ' + json.dumps(description, ensure_ascii=False)
+        + ', "recommendations": ' + json.dumps(list(recommendations), ensure_ascii=False)
+    )
+
+
+_UNKNOWN = DiseaseInfo("", (), _json_fragment("", ()))
+
+
+class DiseaseKnowledgeBase:
+    """
+    Immutable disease → description/precautions index.
+
+    Built once from symptom_Description.csv and symptom_precaution.csv;
+    lookups are dict hits and bulk responses are joined from JSON fragments
+    serialized at build time. Unknown diseases get an empty description and
+    no recommendations.
+    """
+
+    def __init__(self, descriptions: Dict[str, str], recommendations: Dict[str, List[str]]):
+        # Disease names are not spelled consistently across files
+        # ("Diabetes " vs "Diabetes"), so entries are keyed by stripped name.
+        descriptions = {k.strip(): v for k, v in descriptions.items()}
+        recommendations = {k.strip(): v for k, v in recommendations.items()}
+
+        entries = {}
+        for disease in set(descriptions) | set(recommendations):
+            description = descriptions.get(disease, "")
+            recs = tuple(recommendations.get(disease, []))
+            entries[disease] = DiseaseInfo(description, recs, _json_fragment(description, recs))
+
+        self._entries = MappingProxyType(entries)
+
+    @classmethod
+    def from_csv(cls, description_path: str = default_description_path,
+                 precaution_path: str = default_precaution_path) -> "DiseaseKnowledgeBase":
+        descriptions: Dict[str, str] = {}
+        with open(description_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                descriptions.setdefault(row['Disease'], row.get('Description') or "")
+
+        recommendations: Dict[str, List[str]] = {}
+        with open(precaution_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header: Disease, Precaution_1..n
+            for row in reader:
+                if not row:
+                    continue
+                recommendations.setdefault(row[0], [p for p in row[1:] if p])
+
+        return cls(descriptions, recommendations)
+
+    def __contains__(self, disease: str) -> bool:
+        return self.lookup(disease) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, disease: str) -> Optional[DiseaseInfo]:
+        if not isinstance(disease, str):
+            return None
+        return self._entries.get(disease.strip())
+
+    def description(self, disease: str) -> str:
+        return (self.lookup(disease) or _UNKNOWN).description
+
+    def recommendations(self, disease: str) -> List[str]:
+        return list((self.lookup(disease) or _UNKNOWN).recommendations)
+
+    def details(self, diseases) -> List[Dict[str, object]]:
+        out = []
+        for d in diseases:
+            info = self.lookup(d) or _UNKNOWN
+            out.append({
+                "disease": d,
+                "description": info.description,
+                "recommendations": list(info.recommendations),
+            })
+        return out
+
+    def details_json(self, diseases) -> str:
+        """Serialized equivalent of details(), assembled from cached fragments."""
+        parts = []
+        for d in diseases:
+            info = self.lookup(d) or _UNKNOWN
+            parts.append('{"disease": ' + json.dumps(d, ensure_ascii=False) + ', ' + info.json_fragment + '}')
+        return '[' + ', '.join(parts) + ']'
+# '[{"disease": "Malaria", "description": "An infectious disease ...", "recommendations": ["Consult nearest hospital", ...]}]'
+
+
+_knowledge_base: Optional[DiseaseKnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> DiseaseKnowledgeBase:
+    """Shared knowledge base, built from the bundled CSVs on first use."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = DiseaseKnowledgeBase.from_csv()
+    return _knowledge_base
@@ -0,0 +1,152 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class FollowUpEngine:
+    """
+    Follow-up question scoring over a precomputed disease×symptom matrix.
+
+    The boolean matrix and the per-symptom frequency/uniqueness vectors are
+    built once; each request then scores a disease's candidate symptoms with
+    masked NumPy operations and picks the top ones with argpartition.
+
+    Scoring matches generate_follow_up_questions_from_all:
+        score = confidence * uniqueness + 0.3 * (1 / frequency)
+    Symptoms with equal scores are ordered by their position in the symptom
+    list, which makes the output deterministic.
+    """
+
+    def __init__(self, condition_specific_symptoms: Dict[str, List[str]],
+                 symptom_names: Optional[List[str]] = None,
+                 frequency_uniqueness_rarity_percent: Optional[Dict[str, Dict[str, float]]] = None,
+                 fallback_symptoms: Optional[Callable[[str], Iterable[str]]] = None,
+                 disease_names: Optional[List[str]] = None,
+                 matrix: Optional[np.ndarray] = None):
+        """
+        `matrix` (with `disease_names` for its rows and `symptom_names` for
+        its columns) takes a prebuilt matrix, e.g. the memory-mapped one from
+        the artifact store, instead of building it from the dict.
+        """
+        if symptom_names is None:
+            symptom_names = sorted(set().union(*(set(v) for v in condition_specific_symptoms.values())))
+        self.symptom_names = list(symptom_names)
+        self.symptom_index = {s: i for i, s in enumerate(self.symptom_names)}
+        if matrix is None or disease_names is None:
+            disease_names = list(condition_specific_symptoms.keys())
+            matrix = None
+        self.disease_names = list(disease_names)
+        self.disease_index = {d: i for i, d in enumerate(self.disease_names)}
+        self.fallback_symptoms = fallback_symptoms
+
+        if matrix is not None:
+            if matrix.shape != (len(self.disease_names), len(self.symptom_names)):
+                raise ValueError(f"matrix shape {matrix.shape} does not match "
+                                 f"{len(self.disease_names)} diseases x {len(self.symptom_names)} symptoms")
+            self.matrix = matrix
+        else:
+            self.matrix = np.zeros((len(self.disease_names), len(self.symptom_names)), dtype=bool)
+            for d, symptoms in condition_specific_symptoms.items():
+                self.matrix[self.disease_index[d], self._indices(symptoms)] = True
+
+        self._stats_lock = threading.Lock()
+        self._stats_source = None
+        self.set_stats(frequency_uniqueness_rarity_percent or {})
+
+    def _indices(self, symptoms: Iterable[str]) -> List[int]:
+        return [self.symptom_index[s] for s in symptoms if s in self.symptom_index]
+
+    def _mask(self, symptoms: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.symptom_names), dtype=bool)
+        mask[self._indices(symptoms)] = True
+        return mask
+
+    def set_stats(self, frequency_uniqueness_rarity_percent: Dict[str, Dict[str, float]]) -> None:
+        """Load per-symptom frequency/uniqueness (as from get_frequency_uniqueness_rarity_percent)."""
+        stats = frequency_uniqueness_rarity_percent
+        # Same fallbacks as the per-symptom loop: 50% frequency, 1% uniqueness
+        freq = np.array([stats.get(s, {}).get('frequency_percent', 50) / 100 for s in self.symptom_names], dtype=np.float64)
+        uniqueness = np.array([stats.get(s, {}).get('uniqueness', 1.0) / 100 for s in self.symptom_names], dtype=np.float64)
+        rarity = np.ones_like(freq)
+        np.divide(1.0, freq, out=rarity, where=freq > 0)
+        with self._stats_lock:
+            self.frequency = freq
+            self.uniqueness = uniqueness
+            self.rarity_term = 0.3 * rarity
+            self._stats_source = stats
+
+    def ensure_stats(self, frequency_uniqueness_rarity_percent) -> None:
+        if frequency_uniqueness_rarity_percent is not self._stats_source:
+            self.set_stats(frequency_uniqueness_rarity_percent)
+
+    def _disease_row(self, disease: str) -> np.ndarray:
+        i = self.disease_index.get(disease)
+        if i is not None:
+            return self.matrix[i]
+        if self.fallback_symptoms is not None:
+            return self._mask(self.fallback_symptoms(disease) or [])
+        return np.zeros(len(self.symptom_names), dtype=bool)
+
+    def _top_k(self, candidates: np.ndarray, conf: float, k: int) -> List[int]:
+        idx = np.flatnonzero(candidates)
+        if idx.size == 0 or k <= 0:
+            return []
+        scores = conf * self.uniqueness[idx] + self.rarity_term[idx]
+        if idx.size > k:
+            # Keep everything tied with the k-th best so ties resolve by index
+            kth = np.partition(scores, idx.size - k)[idx.size - k]
+            keep = scores >= kth
+            idx, scores = idx[keep], scores[keep]
+        order = np.lexsort((idx, -scores))[:k]
+        return idx[order].tolist()
+
+    def generate(self, all_predictions: List[Dict[str, Any]], current_symptoms: Iterable[str],
+                 symptoms_removed: Optional[Iterable[str]] = None, max_per_disease: int = 3,
+                 max_total: int = 10, min_confidence: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Same output as generate_follow_up_questions_from_all. With
+        `min_confidence`, predictions (in descending confidence order) stop
+        being considered once their confidence drops below it.
+        """
+        excluded = self._mask(current_symptoms) | self._mask(symptoms_removed or ())
+        return self.generate_excluding(all_predictions, excluded, max_per_disease=max_per_disease,
+                                       max_total=max_total, min_confidence=min_confidence)
+
+    def generate_excluding(self, all_predictions: List[Dict[str, Any]], excluded: np.ndarray,
+                           max_per_disease: int = 3, max_total: int = 10,
+                           min_confidence: Optional[float] = None) -> List[Dict[str, Any]]:
+        """generate() with the symptoms not to ask about given as a bool mask over symptom_names."""
+        used = np.zeros(len(self.symptom_names), dtype=bool)
+        used_count = 0
+        questions = []
+
+        for pred in all_predictions:
+            disease = pred['disease']
+            conf = pred['confidence']
+            if min_confidence is not None and conf < min_confidence:
+                break
+
+            candidates = self._disease_row(disease) & ~excluded
+            if not candidates.any():
+                continue
+
+            # Normalize confidence to decimal (0.0-1.0) for calculations
+            normalized_conf = conf / 100.0 if conf >= 1.0 else conf
+            selected = self._top_k(candidates & ~used, normalized_conf, max_per_disease)
+
+            if selected:
+                used[selected] = True
+                used_count += len(selected)
+                selected_symptoms = [self.symptom_names[i] for i in selected]
+                questions.append({
+                    'disease': disease,
+                    'symptoms': selected_symptoms,
+                    'question': f"For {disease} (confidence: {conf:.5f}%), do you have: {', '.join(selected_symptoms)}?",
+                    'confidence': conf
+                })
+
+            if used_count >= max_total:
+                break
+
+        return questions
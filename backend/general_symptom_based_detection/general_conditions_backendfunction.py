@@ -1,19 +1,22 @@
 import os
+import sys
 # Set the environment variable to avoid OpenMP runtime errors
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import load_model
-import json
 
 import spacy
 from spacy.matcher import PhraseMatcher
 
 
+# Symptom matching only compares token text, so every trained component is
+# excluded and the pipeline is reduced to the tokenizer.
+NLP_EXCLUDED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
+
 # Load the spaCy model with graceful fallback
 try:
-    nlp = spacy.load('en_core_web_sm')
+    nlp = spacy.load('en_core_web_sm', exclude=NLP_EXCLUDED_PIPES)
 except Exception:
     try:
         # Fallback to a blank English pipeline if the model isn't installed
@@ -24,66 +27,144 @@ except Exception:
 
 #path of parent directory
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from general_symptom_based_detection.artifact_store import get_artifact_store
+from general_symptom_based_detection.batch_inference import MicroBatchInferenceEngine
+from general_symptom_based_detection.diagnostic_sessions import diff_predictions
+from general_symptom_based_detection.disease_knowledge import get_knowledge_base
+from general_symptom_based_detection.prediction_cache import PredictionCache
+from general_symptom_based_detection.followup_engine import FollowUpEngine
+from app_logging import get_logger
+from cache_backends import artifact_version, get_cache, get_cache_backend
+from metrics import stage_timer
+
+log = get_logger('general')
 
 
-# Load the dictionary from the json file (new folder name)
-json_path = os.path.join(parent_dir, 'general_symptom_based_detection/model_detail.json')
-data = json.load(open(json_path, "r") )
+# model_detail.json, the builder's arrays and the resource JSONs, each loaded once per process
+artifact_store = get_artifact_store()
+json_path = artifact_store.model_detail_path
+data = artifact_store.model_detail
+
+# Inference backend: "keras" (default) or "numpy" (TensorFlow-free forward pass)
+model_backend = os.getenv('GENERAL_MODEL_BACKEND', 'keras').strip().lower()
 
 # Load the model
 model_path = os.path.join(parent_dir, 'general_symptom_based_detection/'+data["model_path"])
-loaded_model = load_model(model_path)
+if model_backend == 'numpy':
+    from general_symptom_based_detection.numpy_model import export_weights, load_numpy_model
+    model_artifact_path = os.path.splitext(model_path)[0] + '.npz'
+    if not os.path.exists(model_artifact_path):
+        export_weights(model_path, model_artifact_path)
+elif model_backend == 'keras':
+    model_artifact_path = model_path
+else:
+    raise ValueError(f"Unknown GENERAL_MODEL_BACKEND: {model_backend}")
+
+# Content hash of what this process serves: the weights (hashed just before
+# loading them) and the model_detail.json bytes `data` was parsed from.
+# Shared cache entries are keyed by it, so they always match the loaded model.
+loaded_artifact_version = artifact_version(
+    [model_artifact_path], extra=artifact_store.digests.get('model_detail', ''),
+)
+if model_backend == 'numpy':
+    loaded_model = load_numpy_model(h5_path=model_path, npz_path=model_artifact_path)
+else:
+    from tensorflow.keras.models import load_model
+    loaded_model = load_model(model_path)
 
 # Load the categories
 diseases_classes = data["diseases_classes"]
 symptoms_classes = data["all_symptoms"]
 symptoms_classes = [s.replace("_", " ") for s in symptoms_classes if isinstance(s, str)]
 
+# Concurrent requests share batched forward passes through the inference engine
+inference_engine = MicroBatchInferenceEngine(
+    lambda batch: loaded_model.predict(batch, verbose=0),
+    max_batch_size=int(os.getenv('GENERAL_BATCH_MAX_SIZE', '32')),
+    max_wait_ms=float(os.getenv('GENERAL_BATCH_MAX_WAIT_MS', '2')),
+)
+
+# Bit i of a symptom bitmask is input position i of the model
+symptom_positions = {s: i for i, s in enumerate(symptoms_classes)}
+
+# Structured input: canonical ("high_fever") and spaced ("high fever") names → input position
+symptom_name_to_index = {s: i for i, s in enumerate(data["all_symptoms"]) if isinstance(s, str)}
+symptom_name_to_index.update(symptom_positions)
+
+# Model outputs keyed by symptom bitmask, for the model loaded above (restart to pick up new
+# weights or model_detail.json). With a shared CACHE_BACKEND, workers also fill and read one
+# another's predictions.
+_cache_backend = get_cache_backend()
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv('GENERAL_PREDICTION_CACHE_SIZE', '4096')),
+    shared=get_cache('general.predictions', loaded_artifact_version, codec='ndarray')
+    if _cache_backend.shared else None,
+)
+
+
+# Descriptions and precautions, indexed once from symptom_Description.csv and symptom_precaution.csv
+knowledge_base = get_knowledge_base()
+
 
-# Load the symptom_Description and symptom_precaution_path files
-symptom_Description_path = os.path.join(parent_dir, "general_symptom_based_detection/dataset/symptom_Description.csv")
-df_des = pd.read_csv(symptom_Description_path)
+# Same parsed model_detail.json as `data`, for disease-specific symptoms
+model_detail = data
 
-symptom_precaution_path = os.path.join(parent_dir, "general_symptom_based_detection/dataset/symptom_precaution.csv")
-df_recom = pd.read_csv(symptom_precaution_path)
+# available_tests from all_disease_specific_model_details.json
+all_disease_specific_model_details = artifact_store.disease_models
 
 
-# Load model_detail.json for disease-specific symptoms
-model_detail_path = os.path.join(parent_dir, 'general_symptom_based_detection/model_detail.json')
-with open(model_detail_path, 'r') as f:
-    model_detail = json.load(f)
 
-# Load dataset for follow-up questions
-dataset_path = os.path.join(parent_dir, 'general_symptom_based_detection/dataset/dataset.csv')
-df_dataset = pd.read_csv(dataset_path)
+def build_symptom_matcher(symptoms):
+    """Compile a PhraseMatcher for the given symptom phrases (tokenizer only)."""
+    matcher = PhraseMatcher(nlp.vocab)
+    matcher.add("SYMPTOMS", list(nlp.tokenizer.pipe(symptoms)))
+    return matcher
+
+
+# Compiled once at load time and reused by every request
+symptom_matcher = build_symptom_matcher(symptoms_classes)
+
+# Matchers for custom symptom lists, keyed by the tuple of phrases
+_custom_matchers = {}
+
 
+def _get_matcher(symptoms):
+    if symptoms is symptoms_classes:
+        return symptom_matcher
+    key = tuple(symptoms)
+    matcher = _custom_matchers.get(key)
+    if matcher is None:
+        matcher = build_symptom_matcher(key)
+        _custom_matchers[key] = matcher
+    return matcher
 
-# Load available_tests from all_disease_specific_model_details.json
-all_disease_specific_model_details_file = os.path.join(parent_dir, 'resources/all_disease_specific_model_details.json')
-with open(all_disease_specific_model_details_file, 'r') as f:
-    all_disease_specific_model_details = json.load(f)
 
+def _extract_matches(matcher, doc):
+    return [doc[start:end].text for match_id, start, end in matcher(doc)]
 
 
 # Function to find symptoms in a sentence
 def find_symptoms(sentence, symptoms=symptoms_classes):
-    # Step 1: Create a PhraseMatcher object
-    matcher = PhraseMatcher(nlp.vocab)
-    
-    # Step 2: Convert symptoms into spaCy doc objects
-    patterns = [nlp(text) for text in symptoms]
-    matcher.add("SYMPTOMS", patterns)
-    
-    # Step 3: Process the sentence with spaCy
-    doc = nlp(sentence)
-    
-    # Step 4: Find matches in the processed sentence
-    matches = matcher(doc)
-    
-    # Step 5: Extract matched symptoms
-    matched_symptoms = [doc[start:end].text for match_id, start, end in matches]
-    
-    return matched_symptoms
+    matcher = _get_matcher(symptoms)
+    doc = nlp.make_doc(sentence)
+    return _extract_matches(matcher, doc)
+# ["high fever", "headache"]
+
+
+def find_symptoms_batch(sentences, symptoms=symptoms_classes, batch_size=256):
+    """
+    Find symptoms in many sentences at once.
+    Returns one list of matched symptoms per input sentence, in input order.
+    """
+    matcher = _get_matcher(symptoms)
+    return [
+        _extract_matches(matcher, doc)
+        for doc in nlp.pipe(sentences, batch_size=batch_size)
+    ]
+# [["high fever", "headache"], [], ["cough"]]
 
 
 
@@ -93,9 +174,75 @@ def symptoms_to_binary(matched_symptoms, all_symptoms):
     return np.array(lis)
 
 
+def symptoms_to_bitmask(matched_symptoms):
+    """Matched symptom names → int with bit i set for model input position i."""
+    mask = 0
+    for symptom in matched_symptoms:
+        i = symptom_positions.get(symptom)
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+
+def structured_symptoms_to_bitmask(symptoms):
+    """
+    Symptom names (canonical or spaced) and/or integer input positions → bitmask.
+    Unknown names and out-of-range indices are ignored; no NLP is involved.
+    """
+    mask = 0
+    n_symptoms = len(symptoms_classes)
+    for s in symptoms:
+        if isinstance(s, (int, np.integer)) and not isinstance(s, bool):
+            if 0 <= s < n_symptoms:
+                mask |= 1 << int(s)
+        elif isinstance(s, str):
+            i = symptom_name_to_index.get(s.strip())
+            if i is not None:
+                mask |= 1 << i
+    return mask
+
+
+def symptoms_input_to_bitmask(symptoms):
+    """Free text goes through the spaCy matcher; lists/sets/tuples of names or indices map directly."""
+    if isinstance(symptoms, str):
+        # function to remove underscores from symptoms
+        return symptoms_to_bitmask(find_symptoms(symptoms.replace("_", " "), symptoms=symptoms_classes))
+    if isinstance(symptoms, (list, set, tuple, frozenset, np.ndarray)):
+        return structured_symptoms_to_bitmask(symptoms)
+    raise ValueError("symptoms must be a string, or a list/set/tuple of symptom names or indices")
+
+
+def binary_to_bitmask(x_input):
+    bits = np.packbits(np.asarray(x_input).reshape(-1) > 0, bitorder='little')
+    return int.from_bytes(bits.tobytes(), 'little')
+
+
+def bitmask_to_binary(mask, n_symptoms=len(symptoms_classes)):
+    raw = mask.to_bytes((n_symptoms + 7) // 8, 'little')
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little')[:n_symptoms]
+    return bits.astype(np.float32)
+
+
+def predict_from_bitmask(mask):
+    """Model output row for a symptom bitmask, served from the prediction cache when possible."""
+    predictions = prediction_cache.get(mask)
+    if predictions is None:
+        predictions = np.array(inference_engine.predict(bitmask_to_binary(mask)))
+        predictions.setflags(write=False)
+        prediction_cache.set(mask, predictions)
+    return predictions
+
+
+def get_prediction_cache_stats():
+    return prediction_cache.stats()
+
+
 def get_prediction_with_confidence(model, x_input, diseases_classes=diseases_classes):
-    # Predict probabilities
-    predictions = model.predict(x_input.reshape(1,-1))
+    # Predict probabilities (the shared model goes through the batching engine)
+    if model is loaded_model:
+        predictions = predict_from_bitmask(binary_to_bitmask(x_input)).reshape(1, -1)
+    else:
+        predictions = model.predict(x_input.reshape(1,-1))
     
     # Get the predicted class (index of the highest probability)
     predicted_class = np.array(diseases_classes) [np.argmax(predictions, axis=1)]
@@ -110,29 +257,19 @@ def get_prediction_with_confidence(model, x_input, diseases_classes=diseases_cla
 def give_description(predicted_disease):
     if not predicted_disease:
      return ""
-    description = df_des[df_des['Disease'] == predicted_disease]["Description"].item()
-    return description
+    return knowledge_base.description(predicted_disease)
 # "A condition with high sugar levels."
 
 def give_recommendation(predicted_disease):
     if not predicted_disease:
         return []
-    recommendations = df_recom[df_recom['Disease'] == predicted_disease]
-    recommendations = [recommendations[col].item() for col in recommendations.drop(columns='Disease').columns if  not pd.isna(recommendations[col].item())]
-    return recommendations
+    return knowledge_base.recommendations(predicted_disease)
 # ["Exercise daily", "Monitor blood sugar"]
 
 def get_disease_details(disease_list):
     if not disease_list:
         return []
-    return [
-        {
-            "disease": d,
-            "description": give_description(d),
-            "recommendations": give_recommendation(d)
-        }
-        for d in disease_list
-    ]
+    return knowledge_base.details(disease_list)
 # [
 #   {
 #     "disease": "Diabetes",
@@ -149,13 +286,20 @@ def get_disease_details(disease_list):
 
 
 def give_predicted_result(sentence):
-    
-    matched_symptoms=find_symptoms(sentence, symptoms=symptoms_classes)
-    if not matched_symptoms:
-        return None
+    """'sentence' is free text, or a list/set of symptom names or indices (no NLP)."""
+    if isinstance(sentence, str):
+        matched_symptoms=find_symptoms(sentence, symptoms=symptoms_classes)
+        if not matched_symptoms:
+            return None
+        inp=symptoms_to_binary(matched_symptoms,symptoms_classes)
+    else:
+        mask = structured_symptoms_to_bitmask(sentence)
+        if not mask:
+            return None
+        inp = bitmask_to_binary(mask)
 
-    inp=symptoms_to_binary(matched_symptoms,symptoms_classes)
     predicted_disease, confidence_score = get_prediction_with_confidence(loaded_model, inp)
+    confidence_score = float(confidence_score)
     description= give_description(predicted_disease)
     recommendations= give_recommendation(predicted_disease)
 
@@ -193,7 +337,8 @@ def get_disease_symptoms(disease_name):
     if symptoms:
         return symptoms
     
-    # Fallback to the original method if not found in JSON
+    # Fallback to the original method if not found in JSON (dataset.csv is read on first use)
+    df_dataset = artifact_store.dataset()
     disease_data = df_dataset[df_dataset['Disease'] == disease_name]
     all_symptoms = set()
     
@@ -208,37 +353,40 @@ def get_disease_symptoms(disease_name):
 def give_top_predictions(symptoms, top_k=None):
     """
     Predict top_k diseases (or all if top_k=None) from given symptoms.
-    'symptoms' can be a string, list, or set of symptom strings.
+    'symptoms' can be a string (matched with the NLP matcher), or a list,
+    set or tuple of symptom names ("high_fever" / "high fever") or integer
+    input indices, which are mapped straight to the model input.
     Returns a list of dicts: { 'disease': ..., 'confidence': ... }
     """
-    print(f"\n\n[DEBUG] give_top_predictions***** backend function******* called with symptoms: {symptoms}, top_k: {top_k}\n\n")
-    # Case 1: Input is a string → use NLP matcher to extract known symptoms
-
-    # function to remove underscores from symptoms
-    symptoms= symptoms.replace("_", " ")
-    matched_symptoms = []
-    if isinstance(symptoms, str):
-        matched_symptoms = find_symptoms(symptoms, symptoms=symptoms_classes)
+    log.debug("give_top_predictions called with symptoms: %s, top_k: %s", symptoms, top_k)
 
-    # Case 2: Input is a list or set → directly match against known symptoms
-    elif isinstance(symptoms, (list, set)):
-        matched_symptoms = [s for s in symptoms if s in symptoms_classes]
-
-    else:
-        raise ValueError("symptoms must be a string, list, or set of strings")
+    # Matched symptom set as a bitmask (the prediction cache key)
+    with stage_timer('general', 'symptom_match'):
+        mask = symptoms_input_to_bitmask(symptoms)
 
     # No matches → return empty list
-    if not matched_symptoms:
+    if not mask:
         # print("symptoms_classes:", symptoms_classes)
-        print(f"\n\n[DEBUG] give_top_predictions found no matched symptoms. Returning empty list.\n\n")
+        log.debug("give_top_predictions found no matched symptoms; returning empty list")
         return []
 
-    # Convert to binary vector
-    inp = symptoms_to_binary(matched_symptoms, symptoms_classes)
-
     # Get predictions
-    predictions = loaded_model.predict(inp.reshape(1, -1))[0]
+    with stage_timer('general', 'predict'):
+        predictions = predict_from_bitmask(mask)
+
+    with stage_timer('general', 'rank'):
+        all_predictions = rank_predictions(predictions, top_k)
+    log.debug("give_top_predictions returning: %s", all_predictions)
+    return all_predictions
+# [
+#     {"disease": "Flu", "confidence": 0.82},
+#     {"disease": "Common Cold", "confidence": 0.10},
+#     {"disease": "COVID-19", "confidence": 0.05}
+# ]
 
+
+def rank_predictions(predictions, top_k=None):
+    """Model output row → [{'disease', 'confidence'}] sorted by confidence, cut to top_k."""
     # Create disease-confidence mapping
     all_predictions = [
         {"disease": diseases_classes[i], "confidence": float(predictions[i])}
@@ -251,13 +399,7 @@ def give_top_predictions(symptoms, top_k=None):
     # Limit results if top_k is provided
     if top_k is not None:
         all_predictions = all_predictions[:top_k]
-    print(f"\n\n[DEBUG] give_top_predictions returning: {all_predictions}\n\n")
     return all_predictions
-# [
-#     {"disease": "Flu", "confidence": 0.82},
-#     {"disease": "Common Cold", "confidence": 0.10},
-#     {"disease": "COVID-19", "confidence": 0.05}
-# ]
 
 
 def get_frequency_uniqueness_rarity_percent(condition_specific_symptoms):
@@ -298,83 +440,41 @@ def get_frequency_uniqueness_rarity_percent(condition_specific_symptoms):
 
 
 
+# Disease×symptom matrix for follow-up scoring: the builder's memory-mapped array
+followup_engine = FollowUpEngine(
+    model_detail.get('condition_specific_symptoms', {}),
+    symptom_names=data["all_symptoms"],
+    frequency_uniqueness_rarity_percent=artifact_store.symptom_stats(),
+    fallback_symptoms=get_disease_symptoms,
+    disease_names=data["diseases_classes"],
+    matrix=artifact_store.array('disease_symptom_matrix'),
+)
+
+
 def generate_follow_up_questions_from_all(
     all_predictions,
     current_symptoms,
     frequency_uniqueness_rarity_percent,
     symptoms_removed=None,
     max_per_disease=3,
-    max_total=10
+    max_total=10,
+    min_confidence=None
 ):
-    if symptoms_removed is None:
-        symptoms_removed = set()
-
-    # generic_symptoms = {"fever", "cough", "fatigue", "headache"}  # optional filter
-    generic_symptoms = set()  # optional filter
-
-    questions = []
-    used_symptoms = set()
-
-    # Preload symptoms for all diseases
-    disease_symptom_mapping = {}
-    for pred in all_predictions:
-        disease = pred['disease']
-        symptoms = get_disease_symptoms(disease)
-        
-        disease_symptom_mapping[disease] = set(symptoms) if symptoms else set()
-    
-    for pred in all_predictions:
-        disease = pred['disease']
-        conf = pred['confidence']
-        disease_symptoms = disease_symptom_mapping[disease]
-
-        # Filter out already known, denied, or generic symptoms
-        candidate_symptoms = (
-            disease_symptoms
-            - current_symptoms
-            - symptoms_removed
-            - generic_symptoms
-        )
-
-        if not candidate_symptoms:
-            continue
-
-        # Get symptoms from other diseases
-        other_symptoms = set().union(*(v for k, v in disease_symptom_mapping.items() if k != disease))
-        symptom_scores = {}
-
-        for s in candidate_symptoms:
-            # Get frequency and uniqueness from the provided dictionary, fallback to default values
-            freq = frequency_uniqueness_rarity_percent.get(s, {}).get('frequency_percent', 50) / 100
-            uniqueness = frequency_uniqueness_rarity_percent.get(s, {}).get('uniqueness', 1.0) /100
-            rarity = 1 / freq if freq > 0 else 1.0
-            
-            # Normalize confidence to decimal (0.0-1.0) for calculations
-            # If confidence is already a percentage (>= 1.0), convert to decimal
-            normalized_conf = conf / 100.0 if conf >= 1.0 else conf
-            
-            # Score combines confidence, uniqueness, and rarity (weighted)
-            symptom_scores[s] = (normalized_conf * uniqueness) + (0.3 * rarity)
-
-        # Sort symptoms by descending score
-        ranked_symptoms = sorted(symptom_scores, key=symptom_scores.get, reverse=True)
-
-        # Pick top symptoms avoiding repeats
-        selected_symptoms = [s for s in ranked_symptoms if s not in used_symptoms][:max_per_disease]
-
-        if selected_symptoms:
-            used_symptoms.update(selected_symptoms)
-            questions.append({
-                'disease': disease,
-                'symptoms': selected_symptoms,
-                'question': f"For {disease} (confidence: {conf:.5f}%), do you have: {', '.join(selected_symptoms)}?",
-                'confidence': conf
-            })
-
-        if len(used_symptoms) >= max_total:
-            break
-
-    return questions
+    """
+    Pick follow-up symptoms to ask about, walking predictions in order.
+    Each disease contributes up to max_per_disease unasked symptoms ranked by
+    confidence * uniqueness + 0.3 * rarity; stops once max_total are picked
+    (or, with min_confidence, at the first prediction below it).
+    """
+    followup_engine.ensure_stats(frequency_uniqueness_rarity_percent)
+    return followup_engine.generate(
+        all_predictions,
+        current_symptoms,
+        symptoms_removed=symptoms_removed,
+        max_per_disease=max_per_disease,
+        max_total=max_total,
+        min_confidence=min_confidence,
+    )
 # [
 #     {
 #         "disease": "Flu",
@@ -386,6 +486,90 @@ def generate_follow_up_questions_from_all(
 # ]
 
 
+def bitmask_to_symptoms(mask):
+    """Canonical symptom names ("high_fever") for the bits set in mask."""
+    names = data["all_symptoms"]
+    return [names[i] for i in range(len(names)) if mask >> i & 1]
+
+
+def apply_session_delta(session, add=None, remove=None, max_per_disease=3, max_total=10, skip_asked=True):
+    """
+    Apply one turn to a DiagnosticSession and return only what changed.
+
+    `add` / `remove` are free text or lists of symptom names/indices, as for
+    give_top_predictions; removed symptoms count as denied and are not asked
+    about again. The model only runs when the symptom set changed, and
+    follow-up questions are only recomputed when something changed. With
+    `skip_asked`, symptoms from earlier questions are not asked again.
+    """
+    add_mask = symptoms_input_to_bitmask(add) if add else 0
+    remove_mask = symptoms_input_to_bitmask(remove) if remove else 0
+
+    symptom_mask = (session.symptom_mask | add_mask) & ~remove_mask
+    removed_mask = (session.removed_mask | remove_mask) & ~add_mask
+    added_bits = symptom_mask & ~session.symptom_mask
+    removed_bits = (session.symptom_mask & ~symptom_mask) | (removed_mask & ~session.removed_mask)
+    changed = bool(added_bits or removed_bits) or session.turn == 0
+
+    delta = {"session_id": session.session_id}
+    if changed:
+        session.symptom_mask, session.removed_mask = symptom_mask, removed_mask
+
+        if symptom_mask != session.predictions_mask or session.predictions is None:
+            with stage_timer('general', 'predict'):
+                session.predictions = predict_from_bitmask(symptom_mask) if symptom_mask else None
+            session.predictions_mask = symptom_mask
+
+        with stage_timer('general', 'rank'):
+            all_predictions = rank_predictions(session.predictions) if session.predictions is not None else []
+        top = all_predictions if session.top_k is None else all_predictions[:session.top_k]
+        prediction_changes = diff_predictions(session.last_predictions, top)
+        session.last_predictions = top
+
+        excluded_mask = symptom_mask | removed_mask | (session.asked_mask if skip_asked else 0)
+        questions = followup_engine.generate_excluding(
+            all_predictions,
+            bitmask_to_binary(excluded_mask) > 0,
+            max_per_disease=max_per_disease,
+            max_total=max_total,
+        ) if all_predictions else []
+        for q in questions:
+            session.asked_mask |= structured_symptoms_to_bitmask(q['symptoms'])
+        questions_changed = questions != session.last_questions
+        session.last_questions = questions
+
+        session.turn += 1
+        delta["added"] = bitmask_to_symptoms(added_bits)
+        delta["removed"] = bitmask_to_symptoms(removed_bits)
+        if prediction_changes is not None:
+            delta["predictions"] = prediction_changes
+        if questions_changed:
+            delta["follow_up_questions"] = questions
+    delta["turn"] = session.turn
+    return delta
+# {
+#     "session_id": "q3Hk...",
+#     "turn": 3,
+#     "added": ["chills"],
+#     "removed": [],
+#     "predictions": {"changed": [{"disease": "Malaria", "confidence": 0.61, "rank": 0}], "dropped": []},
+#     "follow_up_questions": [{"disease": "Malaria", "symptoms": ["sweating"], ...}]
+# }
+
+
+def session_state(session):
+    """Everything a client needs to (re)render a session."""
+    return {
+        "session_id": session.session_id,
+        "turn": session.turn,
+        "current_symptoms": bitmask_to_symptoms(session.symptom_mask),
+        "symptoms_removed": bitmask_to_symptoms(session.removed_mask),
+        "asked_symptoms": bitmask_to_symptoms(session.asked_mask),
+        "predictions": session.last_predictions,
+        "follow_up_questions": session.last_questions,
+    }
+
+
 
 
 # r=give_predicted_result("I have been experiencing chills , fatigue, my eyes are red and pain in chest and muscle with high fever and cough and running nose. i am feeling irritation in throat and headache")
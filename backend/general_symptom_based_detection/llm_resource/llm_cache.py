@@ -0,0 +1,198 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r"\s+", " ", str(message or "")).strip().lower()
+    return text.rstrip(" .!?")
+
+
+def make_cache_key(message: str, system_prompt: str, model: str) -> str:
+    """Key on the normalized message, the prompt version and the model name."""
+    prompt_hash = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+    raw_key = "\0".join([model, prompt_hash, normalize_message(message)])
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+class LLMReplyCache:
+    """
+    Two-tier cache for parsed LLM replies.
+
+    Tier 1 is an in-process LRU; tier 2 is a SQLite file shared across
+    restarts. Entries expire after `ttl_seconds`; each tier evicts its least
+    recently used entries beyond its size limit. Values are JSON-serializable
+    dicts ({"raw": ..., "normalized": ...}).
+
+    `shared` is an optional cache_backends.NamespacedCache consulted after
+    the local tiers and written on every set, so replies fetched by one
+    worker (or host) are reused by the others.
+    """
+
+    def __init__(self, db_path: Optional[str], ttl_seconds: float = 7 * 24 * 3600,
+                 max_memory_entries: int = 1024, max_disk_entries: int = 100000, shared=None):
+        self.db_path = db_path
+        self.shared = shared
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_memory_entries = max(0, int(max_memory_entries))
+        self.max_disk_entries = max(0, int(max_disk_entries))
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL,"
+                    " last_access REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers and the writer overlap
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]) -> None:
+        if self.max_memory_entries == 0:
+            return
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self._counters["memory_evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+        if self.db_path:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self._count("disk_hits")
+                    return value
+            except sqlite3.Error:
+                pass
+
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if isinstance(value, dict):
+                self._remember(key, now + self.ttl_seconds, value)
+                self._count("shared_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._remember(key, expires_at, value)
+        self._count("sets")
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+        if not self.db_path:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_disk_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN"
+                    " (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._count("disk_evictions", overflow)
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+        disk_entries = None
+        if self.db_path:
+            try:
+                disk_entries = self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        hits = counters["memory_hits"] + counters["disk_hits"] + counters["shared_hits"]
+        lookups = hits + counters["misses"]
+        counters.update({
+            "hits": hits,
+            "hit_ratio": (hits / lookups) if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "ttl_seconds": self.ttl_seconds,
+        })
+        if self.shared is not None:
+            counters["shared"] = self.shared.stats()
+        return counters
+# {
+#     "memory_hits": 12, "disk_hits": 3, "shared_hits": 0, "misses": 20, "sets": 20,
+#     "memory_evictions": 0, "disk_evictions": 0,
+#     "hits": 15, "hit_ratio": 0.43, "memory_entries": 20, "disk_entries": 57,
+#     "ttl_seconds": 604800.0
+# }
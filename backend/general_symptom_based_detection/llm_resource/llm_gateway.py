@@ -0,0 +1,188 @@
+import asyncio
+import random
+import concurrent.futures
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class LLMGatewayError(Exception):
+    """LLM call failed (after retries)."""
+
+
+class LLMTimeoutError(LLMGatewayError):
+    """The per-request deadline passed before the LLM answered."""
+
+
+class LLMOverloadedError(LLMGatewayError):
+    """Too many LLM calls are already waiting for a slot."""
+
+
+class LLMGateway:
+    """
+    Async gateway to an OpenAI-compatible chat completions API.
+
+    All calls run on one background event loop that owns a pooled
+    httpx.AsyncClient, so connections are reused across requests. Each call
+    gets a deadline covering queueing, retries and backoff; transient errors
+    are retried with jittered exponential backoff; at most `max_concurrency`
+    calls are in flight and at most `max_pending` may wait for a slot, so a
+    slow upstream cannot hold an unbounded number of Flask worker threads.
+
+    `base_url` can point at any OpenAI-compatible server (e.g. a local stub).
+    """
+
+    def __init__(self, api_key: str, base_url: str, model: str,
+                 timeout_seconds: float = 20.0, max_retries: int = 2,
+                 max_concurrency: int = 8, max_pending: int = 32,
+                 max_connections: int = 20, backoff_base_seconds: float = 0.25,
+                 backoff_max_seconds: float = 4.0):
+        import httpx
+        from openai import AsyncOpenAI
+        import openai
+
+        self.model = model
+        self.timeout_seconds = float(timeout_seconds)
+        self.max_retries = max(0, int(max_retries))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_pending = max(0, int(max_pending))
+        self.backoff_base_seconds = float(backoff_base_seconds)
+        self.backoff_max_seconds = float(backoff_max_seconds)
+
+        self._transient_errors = (
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        )
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+        async def setup():
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections),
+                timeout=httpx.Timeout(self.timeout_seconds),
+            )
+            # Retries are handled here so they respect the request deadline
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key,
+                                 http_client=http_client, max_retries=0)
+            return client, asyncio.Semaphore(self.max_concurrency)
+
+        self._client, self._semaphore = asyncio.run_coroutine_threadsafe(setup(), self._loop).result()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "calls": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "in_flight": 0,
+        }
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        cap = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    async def _complete(self, messages: List[Dict[str, str]], deadline: float) -> str:
+        loop = asyncio.get_running_loop()
+
+        remaining = deadline - loop.time()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError("timed out waiting for a free LLM slot")
+
+        self._bump("in_flight")
+        try:
+            attempt = 0
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise LLMTimeoutError("LLM deadline exceeded")
+                try:
+                    completion = await asyncio.wait_for(
+                        self._client.chat.completions.create(model=self.model, messages=messages),
+                        remaining,
+                    )
+                    return completion.choices[0].message.content or ""
+                except asyncio.TimeoutError:
+                    raise LLMTimeoutError("LLM deadline exceeded")
+                except self._transient_errors as e:
+                    delay = self._backoff(attempt)
+                    if attempt >= self.max_retries or loop.time() + delay >= deadline:
+                        raise LLMGatewayError(str(e)) from e
+                    attempt += 1
+                    self._bump("retries")
+                    await asyncio.sleep(delay)
+        finally:
+            self._bump("in_flight", -1)
+            self._semaphore.release()
+
+    def complete(self, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> str:
+        """Blocking call from a request thread; returns the reply text."""
+        timeout = self.timeout_seconds if timeout is None else float(timeout)
+
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_pending:
+                self._stats["rejected"] += 1
+                raise LLMOverloadedError("too many LLM requests in progress")
+            self._pending += 1
+            self._stats["calls"] += 1
+
+        try:
+            deadline = self._loop.time() + timeout
+            future = asyncio.run_coroutine_threadsafe(self._complete(messages, deadline), self._loop)
+            try:
+                # Small grace period so the coroutine reports its own timeout
+                reply = future.result(timeout + 1.0)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                raise LLMTimeoutError("LLM deadline exceeded")
+        except LLMTimeoutError:
+            self._bump("timeouts")
+            self._bump("failed")
+            raise
+        except LLMGatewayError:
+            self._bump("failed")
+            raise
+        except Exception as e:
+            self._bump("failed")
+            raise LLMGatewayError(str(e)) from e
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        self._bump("succeeded")
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        stats.update({
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout_seconds,
+            "max_retries": self.max_retries,
+        })
+        return stats
+
+    def close(self) -> None:
+        async def shutdown():
+            await self._client.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
@@ -1,69 +1,68 @@
 import pandas as pd
+import numpy as np
 import json
 import os
 import sys
+import time
 
 # Get the parent directory of the current script
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
 sys.path.insert(0, parent_dir)
 
+# Artifact layout and builders are shared with the server, which reads them through artifact_store
+from artifact_store import ARTIFACT_FILES, BUILDER_VERSION, MANIFEST_FILE, build_binary_artifacts, input_hash
+
+dataset_path = os.path.join(parent_dir, 'dataset/dataset.csv')
+artifacts_dir = os.path.join(parent_dir, 'artifacts')
+manifest_path = os.path.join(artifacts_dir, MANIFEST_FILE)
+
+
 def load_dataset():
     """Load the main dataset"""
-    dataset_path = os.path.join(parent_dir, 'dataset/dataset.csv')
     return pd.read_csv(dataset_path)
 
 
+def disease_symptom_pairs(df_dataset):
+    """Unique (Disease, Symptom) pairs in long form: one melt instead of per-row iteration"""
+    long = df_dataset.melt(id_vars=df_dataset.columns[0], value_name='Symptom')
+    long = long.rename(columns={df_dataset.columns[0]: 'Disease'})[['Disease', 'Symptom']]
+    long = long[long['Symptom'].notna()]
+    long['Symptom'] = long['Symptom'].astype(str).str.strip()
+    long = long[long['Symptom'] != '']
+    return long.drop_duplicates(['Disease', 'Symptom'])
 
-def extract_disease_symptoms(df_dataset):
+
+def extract_disease_symptoms(df_dataset, pairs=None):
     """Extract symptoms for each disease from the dataset"""
-    condition_specific_symptoms = {}
-    
-    # Get unique diseases
-    unique_diseases = df_dataset['Disease'].unique()
-    
-    for disease in unique_diseases:
-        # Get all rows for this disease
-        disease_data = df_dataset[df_dataset['Disease'] == disease]
-        
-        # Set to store all unique symptoms for this disease
-        disease_symptoms = set()
-        
-        # Iterate through all rows for this disease
-        for _, row in disease_data.iterrows():
-            # Get all symptoms from the row (skip the Disease column)
-            symptoms = [s.strip() for s in row[1:] if pd.notna(s) and s.strip()]
-            disease_symptoms.update(symptoms)
-        
-        # Convert set to sorted list
-        condition_specific_symptoms[disease] = sorted(list(disease_symptoms))
-    
-    return condition_specific_symptoms
-
-def extract_all_symptoms(df_dataset):
-    """Extract all unique symptoms from the dataset"""
-    all_symptoms = set()
-    
-    for _, row in df_dataset.iterrows():
-        symptoms = [s.strip() for s in row[1:] if pd.notna(s) and s.strip()]
-        all_symptoms.update(symptoms)
-    
-    return sorted(list(all_symptoms))
+    if pairs is None:
+        pairs = disease_symptom_pairs(df_dataset)
+    grouped = pairs.groupby('Disease', sort=False)['Symptom'].agg(sorted)
 
+    # Keys keep the dataset's first-appearance order, as model_detail.json always has
+    return {disease: grouped.get(disease, []) for disease in df_dataset['Disease'].unique()}
 
 
-def create_model_detail_data():
+def extract_all_symptoms(df_dataset, pairs=None):
+    """Extract all unique symptoms from the dataset"""
+    if pairs is None:
+        pairs = disease_symptom_pairs(df_dataset)
+    return sorted(pairs['Symptom'].unique().tolist())
+
+
+def create_model_detail_data(df_dataset=None):
     """Create model_detail.json compatible data file"""
-    print("Loading datasets...")
-    
-    # Load main dataset
-    df_dataset = load_dataset()
-    
+    if df_dataset is None:
+        print("Loading datasets...")
+        df_dataset = load_dataset()
+
+    pairs = disease_symptom_pairs(df_dataset)
+
     print("Extracting disease symptoms...")
-    condition_specific_symptoms = extract_disease_symptoms(df_dataset)
-    
+    condition_specific_symptoms = extract_disease_symptoms(df_dataset, pairs)
+
     print("Extracting all symptoms...")
-    all_symptoms = extract_all_symptoms(df_dataset)
-    
+    all_symptoms = extract_all_symptoms(df_dataset, pairs)
+
     # Create model_detail.json compatible structure
     model_detail_data = {
         "model_path": "general_conditions_model.h5",
@@ -71,73 +70,137 @@ def create_model_detail_data():
         "all_symptoms": all_symptoms,
         "condition_specific_symptoms": condition_specific_symptoms
     }
-    
+
     return model_detail_data
 
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
 def save_data(data, filename="model_detail.json"):
     """Save the data to a JSON file"""
     output_path = os.path.join(parent_dir, filename)
-    
+
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-    
+
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    _atomic_write(output_path, write)
+
     print(f"Data saved to: {output_path}")
     return output_path
 
+
+def save_artifacts(arrays, digest, out_dir=artifacts_dir):
+    """Write the .npy artifacts, then the manifest (last, so it only names complete files)"""
+    os.makedirs(out_dir, exist_ok=True)
+    for key, fname in ARTIFACT_FILES.items():
+        def write(path, value=arrays[key]):
+            with open(path, 'wb') as f:
+                np.save(f, value, allow_pickle=False)
+        _atomic_write(os.path.join(out_dir, fname), write)
+
+    manifest = {
+        "builder_version": BUILDER_VERSION,
+        "input_sha256": digest,
+        "inputs": [os.path.relpath(dataset_path, parent_dir)],
+        "created_at": time.time(),
+        "n_diseases": int(arrays["disease_names"].shape[0]),
+        "n_symptoms": int(arrays["symptom_names"].shape[0]),
+        "files": ARTIFACT_FILES,
+    }
+
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4)
+    _atomic_write(os.path.join(out_dir, MANIFEST_FILE), write)
+    return manifest
+# {
+#     "builder_version": 1,
+#     "input_sha256": "9c1f...",
+#     "inputs": ["dataset/dataset.csv"],
+#     "n_diseases": 41,
+#     "n_symptoms": 131,
+#     "files": {"symptom_names": "symptom_names.npy", ...}
+# }
+
+
+def is_up_to_date(digest):
+    """True when the manifest matches these inputs and every output is present"""
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("input_sha256") != digest:
+        return False
+    outputs = [os.path.join(parent_dir, 'model_detail.json')]
+    outputs += [os.path.join(artifacts_dir, fname) for fname in ARTIFACT_FILES.values()]
+    return all(os.path.exists(p) for p in outputs)
+
+
 def print_summary(data):
     """Print a summary of the created data"""
     print("\n" + "="*60)
     print("MODEL DETAIL DATA SUMMARY")
     print("="*60)
-    
+
     print(f"Model Path: {data['model_path']}")
     print(f"Total Diseases: {len(data['diseases_classes'])}")
     print(f"Total Symptoms: {len(data['all_symptoms'])}")
-    
+
     print("\nDISEASES:")
     print("-" * 40)
     for i, disease in enumerate(data['diseases_classes'], 1):
         symptom_count = len(data['condition_specific_symptoms'][disease])
         print(f"{i:2d}. {disease} ({symptom_count} symptoms)")
-    
+
     print(f"\nSYMPTOMS:")
     print("-" * 40)
     print(f"Total unique symptoms: {len(data['all_symptoms'])}")
-    
+
     # Show some sample symptoms
     print("Sample symptoms:")
     for i, symptom in enumerate(data['all_symptoms'][:10], 1):
         print(f"  {i}. {symptom}")
-    
+
     if len(data['all_symptoms']) > 10:
         print(f"  ... and {len(data['all_symptoms']) - 10} more symptoms")
 
-def main():
-    """Main function to create model_detail.json data"""
+
+def main(force=False):
+    """Build model_detail.json and the binary artifacts, unless the inputs are unchanged"""
     print("Creating model_detail.json data...")
     print("="*60)
-    
+
     try:
+        digest = input_hash([dataset_path])
+        if not force and is_up_to_date(digest):
+            print(f"Inputs unchanged (sha256 {digest[:12]}); nothing to rebuild. Use --force to rebuild anyway.")
+            return
+
         # Create model detail data
         data = create_model_detail_data()
-        
+
         # Save to file (will overwrite if exists)
         output_path = save_data(data)
-        
+        save_artifacts(build_binary_artifacts(data), digest)
+        print(f"Artifacts saved to: {artifacts_dir}")
+
         # Print summary
         print_summary(data)
-        
+
         print(f"\n✅ Successfully created model_detail.json!")
         print(f"📁 File saved as: {output_path}")
-        print("🔄 File will be overwritten if it already exists")
-        
+
     except Exception as e:
         print(f"❌ Error creating data: {str(e)}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(force="--force" in sys.argv[1:])
@@ -0,0 +1,188 @@
+"""
+TensorFlow-free inference for the general conditions model.
+
+The model is a small stack of Dense layers, so its weights are exported from
+general_conditions_model.h5 into a compact .npz and evaluated with NumPy.
+
+Usage (from the backend directory):
+    python general_symptom_based_detection/numpy_model.py export
+    python general_symptom_based_detection/numpy_model.py check
+"""
+import os
+import sys
+import json
+
+import numpy as np
+import h5py
+
+
+model_dir = os.path.abspath(os.path.dirname(__file__))
+
+default_h5_path = os.path.join(model_dir, 'general_conditions_model.h5')
+default_npz_path = os.path.join(model_dir, 'general_conditions_model.npz')
+test_json_path = os.path.join(model_dir, 'test', 'test.json')
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    e = np.exp(shifted)
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "softmax": _softmax,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+}
+
+
+def _find_layer_weights(layer_group):
+    """Return (kernel, bias) datasets stored anywhere under a layer's weight group."""
+    found = {}
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            leaf = name.rsplit('/', 1)[-1].split(':')[0]
+            if leaf in ("kernel", "bias"):
+                found[leaf] = obj[()]
+
+    layer_group.visititems(visit)
+    return found.get("kernel"), found.get("bias")
+
+
+def export_weights(h5_path=default_h5_path, npz_path=default_npz_path):
+    """Extract Dense layer weights from a Keras .h5 file into a .npz."""
+    with h5py.File(h5_path, 'r') as f:
+        config = f.attrs['model_config']
+        if isinstance(config, bytes):
+            config = config.decode('utf-8')
+        config = json.loads(config)
+
+        arrays = {}
+        activations = []
+        for layer in config["config"]["layers"]:
+            if layer["class_name"] == "InputLayer":
+                continue
+            if layer["class_name"] != "Dense":
+                raise ValueError(f"Unsupported layer type for NumPy backend: {layer['class_name']}")
+
+            name = layer["config"]["name"]
+            activation = layer["config"].get("activation", "linear")
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for NumPy backend: {activation}")
+
+            kernel, bias = _find_layer_weights(f['model_weights'][name])
+            if kernel is None:
+                raise ValueError(f"No kernel found for layer {name}")
+            if bias is None:
+                bias = np.zeros(kernel.shape[1], dtype=kernel.dtype)
+
+            i = len(activations)
+            arrays[f"kernel_{i}"] = kernel.astype(np.float32)
+            arrays[f"bias_{i}"] = bias.astype(np.float32)
+            activations.append(activation)
+
+    np.savez(npz_path, activations=np.array(activations), **arrays)
+    return npz_path
+
+
+class NumpyDenseModel:
+    """Forward pass of a Dense-only Keras model, with a Keras-like predict()."""
+
+    def __init__(self, kernels, biases, activations):
+        self.kernels = kernels
+        self.biases = biases
+        self.activations = [ACTIVATIONS[a] for a in activations]
+        self.activation_names = list(activations)
+
+    @classmethod
+    def load(cls, npz_path=default_npz_path):
+        with np.load(npz_path) as data:
+            activations = [str(a) for a in data["activations"]]
+            kernels = [data[f"kernel_{i}"] for i in range(len(activations))]
+            biases = [data[f"bias_{i}"] for i in range(len(activations))]
+        return cls(kernels, biases, activations)
+
+    @property
+    def input_dim(self):
+        return self.kernels[0].shape[0]
+
+    def predict(self, x, verbose=0):
+        out = np.asarray(x, dtype=np.float32).reshape(-1, self.input_dim)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            out = activation(out @ kernel + bias)
+        return out
+
+
+def load_numpy_model(npz_path=default_npz_path, h5_path=default_h5_path):
+    """Load the exported weights, exporting them from the .h5 first if missing."""
+    if not os.path.exists(npz_path):
+        export_weights(h5_path, npz_path)
+    return NumpyDenseModel.load(npz_path)
+
+
+def check_parity(npz_path=default_npz_path, h5_path=default_h5_path, atol=1e-5):
+    """
+    Compare NumPy outputs against Keras on test/test.json.
+    Returns a summary dict; Keras parity is skipped if TensorFlow is unavailable.
+    """
+    with open(test_json_path, 'r') as f:
+        test_data = json.load(f)
+    x = np.array(test_data["testx"], dtype=np.float32)
+    y = np.array(test_data["testy"])
+
+    np_model = load_numpy_model(npz_path, h5_path)
+    np_out = np_model.predict(x)
+
+    summary = {
+        "samples": int(len(x)),
+        "numpy_accuracy": float(np.mean(np.argmax(np_out, axis=1) == y)),
+    }
+
+    try:
+        from tensorflow.keras.models import load_model
+    except ImportError:
+        summary["keras_parity"] = "skipped (tensorflow not installed)"
+        return summary
+
+    keras_out = load_model(h5_path).predict(x, verbose=0)
+    max_abs_diff = float(np.max(np.abs(keras_out - np_out)))
+    summary.update({
+        "keras_accuracy": float(np.mean(np.argmax(keras_out, axis=1) == y)),
+        "max_abs_diff": max_abs_diff,
+        "argmax_agreement": float(np.mean(np.argmax(keras_out, axis=1) == np.argmax(np_out, axis=1))),
+        "keras_parity": "ok" if max_abs_diff <= atol else "mismatch",
+    })
+    return summary
+# {
+#     "samples": 492,
+#     "numpy_accuracy": 1.0,
+#     "keras_accuracy": 1.0,
+#     "max_abs_diff": 5.9e-08,
+#     "argmax_agreement": 1.0,
+#     "keras_parity": "ok"
+# }
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    if command == "export":
+        print(f"Exported weights to: {export_weights()}")
+    elif command == "check":
+        result = check_parity()
+        print(json.dumps(result, indent=4))
+        if result.get("keras_parity") == "mismatch":
+            sys.exit(1)
+    else:
+        print("usage: numpy_model.py [export|check]")
+        sys.exit(2)
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    Bounded LRU of model outputs keyed by symptom bitmask.
+
+    Entries are only valid for the model this process loaded at import time.
+    The weights and model_detail.json are never reloaded, so replacing them
+    on disk takes effect after a restart, which also starts an empty cache.
+
+    `shared` is an optional second tier (a cache_backends.NamespacedCache
+    with the ndarray codec) that other worker processes also read and
+    fill. Its version is the content hash of the artifacts this process
+    actually loaded and never changes while the process runs, so a process
+    still serving an old model can't write under a newer model's keys.
+    """
+
+    def __init__(self, max_entries: int = 4096, shared=None):
+        self.max_entries = max(0, int(max_entries))
+        self.shared = shared
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _shared_key(key: Hashable) -> str:
+        # Symptom bitmasks as hex; anything else by its repr
+        return format(key, 'x') if isinstance(key, int) else repr(key)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.shared is not None:
+            value = self.shared.get(self._shared_key(key))
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._remember(key, value)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value)
+
+    def _remember(self, key: Hashable, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": ((self.hits + self.shared_hits) / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+# {"entries": 212, "max_entries": 4096, "hits": 1530, "shared_hits": 40, "misses": 172,
+#  "hit_ratio": 0.901, "evictions": 0, "shared": {"namespace": "general.predictions", ...}}
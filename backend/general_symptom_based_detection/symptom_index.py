@@ -0,0 +1,360 @@
+import os
+import re
+import sys
+import json
+import threading
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Lay phrasings for canonical symptoms. Entries whose target is not in the
+# symptom list being indexed are ignored.
+SYMPTOM_SYNONYMS: Dict[str, List[str]] = {
+    "high_fever": ["high temperature", "fever", "feverish", "running a temperature"],
+    "mild_fever": ["low fever", "slight fever", "low grade fever", "slight temperature"],
+    "headache": ["head ache", "head pain", "head hurts", "head is pounding"],
+    "cough": ["coughing"],
+    "vomiting": ["throwing up", "vomit", "puking"],
+    "nausea": ["nauseous", "feel sick", "queasy"],
+    "fatigue": ["tired", "tiredness", "exhausted", "exhaustion"],
+    "lethargy": ["sluggish", "no energy"],
+    "diarrhoea": ["diarrhea", "loose motions", "loose stools", "runny stool"],
+    "constipation": ["constipated"],
+    "stomach_pain": ["stomach ache", "tummy ache", "tummy pain", "stomach hurts"],
+    "abdominal_pain": ["belly pain", "abdomen pain"],
+    "chest_pain": ["pain in chest", "chest hurts"],
+    "back_pain": ["backache", "back ache", "back hurts"],
+    "joint_pain": ["joints hurt", "aching joints", "pain in joints"],
+    "muscle_pain": ["muscle ache", "muscles ache", "body ache", "body aches"],
+    "runny_nose": ["running nose", "nose is running"],
+    "continuous_sneezing": ["sneezing", "sneezes"],
+    "breathlessness": ["shortness of breath", "short of breath", "cant breathe", "difficulty breathing"],
+    "skin_rash": ["rash", "rashes"],
+    "itching": ["itchy", "itch"],
+    "chills": ["shivering", "feeling cold"],
+    "dizziness": ["dizzy", "lightheaded", "light headed"],
+    "loss_of_appetite": ["no appetite", "not hungry", "poor appetite"],
+    "weight_loss": ["losing weight", "lost weight"],
+    "weight_gain": ["gaining weight", "gained weight"],
+    "sweating": ["sweaty"],
+    "anxiety": ["anxious"],
+    "throat_irritation": ["sore throat", "scratchy throat"],
+    "redness_of_eyes": ["red eyes"],
+    "yellowish_skin": ["yellow skin"],
+    "yellowing_of_eyes": ["yellow eyes"],
+    "burning_micturition": ["burning urination", "burning when peeing", "painful urination"],
+    "fast_heart_rate": ["racing heart", "heart racing", "palpitations"],
+    "blurred_and_distorted_vision": ["blurred vision", "blurry vision"],
+    "indigestion": ["upset stomach"],
+    "acidity": ["heartburn", "acid reflux"],
+}
+
+NEGATION_CUES = {"no", "not", "without", "dont", "don't", "didnt", "didn't", "never", "none", "nor", "neither"}
+NEGATION_WINDOW = 3
+# Words that end the scope of a preceding negation ("no cough but fever")
+NEGATION_BREAKS = {"but", "however", "though", "although", "yet"}
+# Between two symptoms these keep a negation going ("no fever and headache", "no fever, cough or chills")
+NEGATION_LIST_JOINERS = {"and", "or", "nor", "any"}
+
+# Filler words: windows starting or ending on one are not fuzzy-matched, and
+# they don't count against coverage
+STOPWORDS = {
+    "i", "im", "i'm", "ive", "i've", "me", "my", "myself", "a", "an", "the", "and", "or", "but", "also",
+    "have", "has", "had", "having", "am", "is", "are", "was", "were", "been", "be", "being",
+    "got", "get", "getting", "some", "of", "in", "on", "at", "to", "for",
+    "with", "from", "since", "it", "its", "this", "that", "very", "really", "bit", "little", "lot",
+    "much", "too", "quite", "pretty", "so", "just", "day", "days", "week", "weeks", "today",
+    "yesterday", "now", "lately", "recently", "again", "all", "experiencing", "suffering",
+    "sometimes", "please", "hi", "hello", "doctor",
+    "do", "does", "did", "can", "there", "any", "like", "kind", "sort", "of", "as", "well", "by",
+} | NEGATION_CUES
+
+# Severity and "feel" words are part of phrases like "mild fever" or "feeling
+# cold", so they stay inside match windows; on their own they still don't
+# count against coverage
+QUALIFIERS = {"mild", "severe", "slight", "bad", "terrible", "constant", "feel", "feeling", "felt"}
+NON_INFORMATIVE = STOPWORDS | QUALIFIERS
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _normalize_phrase(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(text.replace("_", " ").lower()))
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomIndex:
+    """
+    Typo-tolerant symptom lookup over the canonical symptom names.
+
+    Every symptom name and synonym is indexed by character trigrams. A
+    message is split into word windows (up to the longest indexed phrase);
+    each window pulls a bounded number of candidates from the trigram index
+    and is scored with difflib's similarity ratio. Non-overlapping best
+    matches win, and a negation cue shortly before a match marks the symptom
+    as absent (and every symptom listed right after it, joined by "and"/"or");
+    a cue left over after a symptom ("fever is not there") negates that one.
+    Indexed phrases match exactly even when they start with a filler word,
+    so "no appetite" is a symptom rather than a negation. `coverage` is the
+    share of informative words explained by the matches, so callers can tell
+    whether anything else was said.
+    """
+
+    def __init__(self, symptoms: Iterable[str], synonyms: Optional[Dict[str, List[str]]] = None,
+                 min_score: float = 0.8, max_tokens: int = 64, max_candidates: int = 5):
+        self.min_score = float(min_score)
+        self.max_tokens = int(max_tokens)
+        self.max_candidates = int(max_candidates)
+
+        synonyms = SYMPTOM_SYNONYMS if synonyms is None else synonyms
+        symptoms = [s for s in symptoms if isinstance(s, str)]
+        known = set(symptoms)
+
+        # (phrase, canonical symptom) pairs; exact phrases map straight through
+        self._variants: List[Tuple[str, str]] = []
+        self._exact: Dict[str, str] = {}
+        for name in symptoms:
+            self._add_variant(_normalize_phrase(name), name)
+        for name, phrases in synonyms.items():
+            if name in known:
+                for phrase in phrases:
+                    self._add_variant(_normalize_phrase(phrase), name)
+
+        self._trigram_index: Dict[str, List[int]] = {}
+        self._variant_trigram_counts: List[int] = []
+        for i, (phrase, _) in enumerate(self._variants):
+            grams = _trigrams(phrase)
+            self._variant_trigram_counts.append(len(grams))
+            for g in grams:
+                self._trigram_index.setdefault(g, []).append(i)
+
+        self.max_phrase_words = max((len(p.split()) for p, _ in self._variants), default=1)
+
+    def _add_variant(self, phrase: str, name: str) -> None:
+        if phrase and phrase not in self._exact:
+            self._exact[phrase] = name
+            self._variants.append((phrase, name))
+
+    def match_phrase(self, text: str) -> Optional[Tuple[str, float]]:
+        """Best (symptom, score) for a short phrase, or None below min_score."""
+        phrase = _normalize_phrase(text)
+        if not phrase:
+            return None
+        exact = self._exact.get(phrase)
+        if exact is not None:
+            return exact, 1.0
+        # Very short windows produce too many accidental fuzzy matches
+        if len(phrase) < 4:
+            return None
+
+        grams = _trigrams(phrase)
+        shared: Dict[int, int] = {}
+        for g in grams:
+            for i in self._trigram_index.get(g, ()):
+                shared[i] = shared.get(i, 0) + 1
+        if not shared:
+            return None
+
+        # Dice coefficient on trigrams preselects a bounded candidate set
+        ranked = sorted(
+            shared.items(),
+            key=lambda item: 2.0 * item[1] / (len(grams) + self._variant_trigram_counts[item[0]]),
+            reverse=True,
+        )[:self.max_candidates]
+
+        best = None
+        for i, _ in ranked:
+            candidate, name = self._variants[i]
+            score = SequenceMatcher(None, phrase, candidate).ratio()
+            if best is None or score > best[1]:
+                best = (name, score)
+        if best is None or best[1] < self.min_score:
+            return None
+        return best
+
+    @staticmethod
+    def _negation_before(tokens: List[str], start: int) -> Optional[int]:
+        """Position of a negation cue shortly before `start`, or None."""
+        for i in range(start - 1, max(0, start - NEGATION_WINDOW) - 1, -1):
+            if tokens[i] in NEGATION_BREAKS:
+                return None
+            if tokens[i] in NEGATION_CUES:
+                return i
+        return None
+
+    @staticmethod
+    def _joined(tokens: List[str], first: Tuple, second: Tuple) -> bool:
+        """Only list joiners ("and", "or") between two matches."""
+        return all(t in NEGATION_LIST_JOINERS for t in tokens[first[0] + first[1]:second[0]])
+
+    def extract(self, message: str) -> Dict[str, Any]:
+        """
+        Find symptoms mentioned in a free-text message.
+
+        Returns present/absent symptoms with confidence scores, the lowest
+        score among them ("confidence") and the coverage of informative words.
+        """
+        tokens = _TOKEN_RE.findall(str(message or "").lower())[:self.max_tokens]
+
+        candidates = []
+        for size in range(1, self.max_phrase_words + 1):
+            for start in range(0, len(tokens) - size + 1):
+                window = tokens[start:start + size]
+                phrase = " ".join(window)
+                # Indexed phrases always match, even ones starting with a filler word ("no appetite")
+                exact = self._exact.get(phrase)
+                if exact is not None:
+                    candidates.append((1.0, size, start, exact))
+                    continue
+                # Otherwise windows that start or end on filler words are never better than their core
+                if window[0] in STOPWORDS or window[-1] in STOPWORDS:
+                    continue
+                hit = self.match_phrase(phrase)
+                if hit is not None:
+                    candidates.append((hit[1], size, start, hit[0]))
+
+        # Highest score first, longer spans break ties; keep non-overlapping spans
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        taken = [False] * len(tokens)
+        matches = []
+        for score, size, start, name in candidates:
+            if any(taken[start:start + size]):
+                continue
+            for i in range(start, start + size):
+                taken[i] = True
+            matches.append((start, size, name, score))
+
+        # In text order, so a negation carries across a list of symptoms
+        matches.sort()
+        negated = [False] * len(matches)
+        used_cues = set()
+        for m, match in enumerate(matches):
+            cue = self._negation_before(tokens, match[0])
+            if cue is not None:
+                used_cues.add(cue)
+                negated[m] = True
+            elif m and negated[m - 1] and self._joined(tokens, matches[m - 1], match):
+                negated[m] = True
+
+        # A cue no match used up negates the symptom (list) right before it when
+        # only filler words sit around it: "fever is not there", "headache? no".
+        # Followed by other words ("cough, no idea why") it is left alone.
+        dangling = []
+        for i, t in enumerate(tokens):
+            if t not in NEGATION_CUES or taken[i] or i in used_cues:
+                continue
+            m = max((k for k, match in enumerate(matches) if match[0] + match[1] <= i), default=None)
+            between = tokens[matches[m][0] + matches[m][1]:i] if m is not None else []
+            after = []
+            for w in tokens[i + 1:next((match[0] for match in matches if match[0] > i), len(tokens))]:
+                if w in NEGATION_BREAKS:
+                    break
+                after.append(w)
+            if m is None or any(w in NEGATION_BREAKS or w not in NON_INFORMATIVE for w in between) \
+                    or any(w not in NON_INFORMATIVE for w in after):
+                dangling.append(i)
+                continue
+            negated[m] = True
+            while m and self._joined(tokens, matches[m - 1], matches[m]):
+                m -= 1
+                negated[m] = True
+
+        present: Dict[str, float] = {}
+        absent: Dict[str, float] = {}
+        for (start, size, name, score), is_negated in zip(matches, negated):
+            target = absent if is_negated else present
+            target[name] = max(score, target.get(name, 0.0))
+
+        # Cues that negate nothing found count against coverage, so callers
+        # don't trust a reading that may have its meaning backwards
+        informative = [i for i, t in enumerate(tokens) if t not in NON_INFORMATIVE or i in dangling]
+        covered = [i for i in informative if taken[i]]
+        coverage = (len(covered) / len(informative)) if informative else 0.0
+
+        scores = list(present.values()) + list(absent.values())
+        return {
+            "symptoms_to_add": [{"symptom": s, "score": round(v, 4)} for s, v in present.items()],
+            "symptoms_to_removed": [{"symptom": s, "score": round(v, 4)} for s, v in absent.items() if s not in present],
+            "confidence": round(min(scores), 4) if scores else 0.0,
+            "coverage": round(coverage, 4),
+        }
+# {
+#     "symptoms_to_add": [{"symptom": "headache", "score": 0.9333}, {"symptom": "high_fever", "score": 0.9677}],
+#     "symptoms_to_removed": [{"symptom": "cough", "score": 1.0}],
+#     "confidence": 0.9333,
+#     "coverage": 1.0
+# }
+
+
+_symptom_indexes: Dict[Tuple[str, ...], SymptomIndex] = {}
+_symptom_indexes_lock = threading.Lock()
+
+
+def get_symptom_index(symptoms: Iterable[str]) -> SymptomIndex:
+    """Shared index per symptom list, built on first use (and reused by forked workers)."""
+    key = tuple(symptoms)
+    index = _symptom_indexes.get(key)
+    if index is None:
+        with _symptom_indexes_lock:
+            index = _symptom_indexes.get(key)
+            if index is None:
+                index = _symptom_indexes[key] = SymptomIndex(key)
+    return index
+
+
+# Messages whose local reading must not change: (message, present, absent)
+PARITY_CASES: List[Tuple[str, List[str], List[str]]] = [
+    ("I have a mild fever", ["mild_fever"], []),
+    ("slight fever", ["mild_fever"], []),
+    ("mild_fever", ["mild_fever"], []),
+    ("slight temperature", ["mild_fever"], []),
+    ("I have a high fever", ["high_fever"], []),
+    ("feeling cold", ["chills"], []),
+    ("I feel sick", ["nausea"], []),
+    ("not hungry", ["loss_of_appetite"], []),
+    ("I have no appetite", ["loss_of_appetite"], []),
+    ("no energy", ["lethargy"], []),
+    ("I don't have fever and headache", [], ["high_fever", "headache"]),
+    ("no fever, cough or chills", [], ["high_fever", "cough", "chills"]),
+    ("no cough but fever", ["high_fever"], ["cough"]),
+    ("I have fever and no headache", ["high_fever"], ["headache"]),
+    ("severe headache", ["headache"], []),
+    ("fever is not there", [], ["high_fever"]),
+    ("headache? no", [], ["headache"]),
+    ("fever: none", [], ["high_fever"]),
+]
+
+
+def check_parity(symptoms: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Run PARITY_CASES against an index over model_detail.json's symptoms."""
+    if symptoms is None:
+        model_detail_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'model_detail.json')
+        with open(model_detail_path, 'r', encoding='utf-8') as f:
+            symptoms = json.load(f)['all_symptoms']
+    index = SymptomIndex(symptoms)
+    failures = []
+    for message, present, absent in PARITY_CASES:
+        result = index.extract(message)
+        got_present = sorted(m['symptom'] for m in result['symptoms_to_add'])
+        got_absent = sorted(m['symptom'] for m in result['symptoms_to_removed'])
+        if got_present != sorted(present) or got_absent != sorted(absent):
+            failures.append({"message": message, "expected": [sorted(present), sorted(absent)],
+                             "got": [got_present, got_absent]})
+    return {"cases": len(PARITY_CASES), "failures": failures, "parity": "ok" if not failures else "mismatch"}
+# {"cases": 18, "failures": [], "parity": "ok"}
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "check":
+        result = check_parity()
+        print(json.dumps(result, indent=4))
+        if result["parity"] != "ok":
+            sys.exit(1)
+    else:
+        print("usage: symptom_index.py [check]")
+        sys.exit(2)
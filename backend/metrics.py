@@ -0,0 +1,241 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms live in a process-wide registry and are
+rendered by the app's /metrics endpoint. Recording is a dict lookup, a
+bisect and a lock-protected add, so it is cheap enough for every request
+and every inference stage.
+
+    from metrics import stage_timer
+    with stage_timer('general', 'predict'):
+        ...
+
+Under serve.py each worker process keeps its own metrics; a scrape sees
+the worker that answered it. Workers stamp every series with
+worker="<slot>" and pid="<pid>" (a new pid means the worker restarted and
+its counters started over), so aggregate across workers in the query,
+e.g. sum without (worker, pid) (rate(...)).
+
+Environment:
+    METRICS_ENABLED   "0" turns recording into no-ops (1)
+"""
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans sub-millisecond cache hits to multi-second LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') != '0'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None,
+                   const: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in const]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(v) for v in labels)
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f'{self.name}{_format_labels(self.labelnames, k, const=const)} {_format_value(v)}' for k, v in items]
+        return lines
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f'{self.name}{_format_labels(self.labelnames, k, const=const)} {_format_value(v)}' for k, v in items]
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)), const)
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, const=const)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus collect-time callbacks (for values read from elsewhere)."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], None]] = {}
+        self._const_labels: Tuple[Tuple[str, str], ...] = ()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, name: str, fn: Callable[[], None]) -> None:
+        """
+        fn runs before every render, e.g. to copy model load times into a gauge.
+        Adding a collector under an existing name replaces it, so an app that is
+        built again (tests, reloads) doesn't keep the previous one alive.
+        """
+        with self._lock:
+            self._collectors[name] = fn
+
+    def set_const_labels(self, **labels: str) -> None:
+        """Labels added to every rendered series (serve.py: worker slot and pid)."""
+        with self._lock:
+            self._const_labels = tuple((k, str(v)) for k, v in labels.items())
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors.values())
+            metrics = [self._metrics[k] for k in sorted(self._metrics)]
+            const = self._const_labels
+        for fn in collectors:
+            fn()
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render(const))
+        return '\n'.join(lines) + '\n'
+# # HELP medical_stage_seconds Time spent in one stage of a model or LLM call
+# # TYPE medical_stage_seconds histogram
+# medical_stage_seconds_bucket{subsystem="general",stage="predict",le="0.001"} 52
+# ...
+# medical_stage_seconds_sum{subsystem="general",stage="predict"} 0.0731
+# medical_stage_seconds_count{subsystem="general",stage="predict"} 60
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+stage_seconds = REGISTRY.histogram(
+    'medical_stage_seconds', 'Time spent in one stage of a model or LLM call', ('subsystem', 'stage'),
+)
+
+
+@contextmanager
+def stage_timer(subsystem: str, stage: str):
+    """Time a block into medical_stage_seconds{subsystem, stage}."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, subsystem, stage)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,90 @@
+import importlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+
+class ModelRegistry:
+    """
+    Lazily import model backend modules on first use.
+
+    Each backend module loads its model at import time, so importing it is
+    the expensive step. The registry defers that until a route needs the
+    model (or warm_up() is called) and records load state and timing.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, module_path: str) -> None:
+        with self._lock:
+            self._entries[name] = {
+                "module_path": module_path,
+                "module": None,
+                "state": "not_loaded",
+                "load_time_seconds": None,
+                "loaded_at": None,
+                "error": None,
+                "lock": threading.Lock(),
+            }
+
+    def names(self):
+        return list(self._entries.keys())
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry["state"] == "ready")
+
+    def get(self, name: str) -> Any:
+        """Return the backend module, importing it on first use."""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown model: {name}")
+        if entry["module"] is not None:
+            return entry["module"]
+
+        # One loader per model; concurrent callers wait for the same import
+        with entry["lock"]:
+            if entry["module"] is not None:
+                return entry["module"]
+            entry["state"] = "loading"
+            entry["error"] = None
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(entry["module_path"])
+            except Exception as e:
+                entry["state"] = "failed"
+                entry["error"] = str(e)
+                entry["load_time_seconds"] = time.perf_counter() - started
+                raise
+            entry["load_time_seconds"] = time.perf_counter() - started
+            entry["loaded_at"] = time.time()
+            entry["module"] = module
+            entry["state"] = "ready"
+            return module
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the given models (all registered models by default); failures are recorded, not raised."""
+        for name in (list(names) if names is not None else self.names()):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+        return self.status()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": entry["state"],
+                "load_time_seconds": entry["load_time_seconds"],
+                "loaded_at": entry["loaded_at"],
+                "error": entry["error"],
+            }
+            for name, entry in self._entries.items()
+        }
+# {
+#     "general": {"state": "ready", "load_time_seconds": 4.21, "loaded_at": 1757150000.0, "error": None},
+#     "diabetes": {"state": "not_loaded", "load_time_seconds": None, "loaded_at": None, "error": None},
+#     "skin": {"state": "failed", "load_time_seconds": 0.8, "loaded_at": None, "error": "..."}
+# }
@@ -0,0 +1,189 @@
+"""
+Pre-fork production server for the backend.
+
+The master process loads the read-only artifacts (the artifact store with
+its memory-mapped arrays, disease knowledge base, symptom index, and the
+model backends that don't use TensorFlow), opens the listening socket,
+then forks SERVE_WORKERS workers that share both through copy-on-write. Each worker builds its own app, so TensorFlow, the
+LLM gateway's event loop and SQLite connections are created after fork.
+Workers that die are restarted.
+
+Usage (from the backend directory):
+    SERVE_WORKERS=4 python serve.py
+
+Environment:
+    SERVE_HOST / SERVE_PORT       bind address (127.0.0.1:5000)
+    SERVE_WORKERS                 worker processes (CPU count)
+    SERVE_THREADS_PER_WORKER      BLAS/TF threads per worker (CPUs / workers)
+    SERVE_THREADED                handle requests on threads inside a worker (1)
+    SERVE_PRELOAD_MODELS          models loaded before fork ("auto": those without TensorFlow)
+    WARM_UP_MODELS                models each worker loads before accepting ("all" by default here)
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import importlib
+from typing import Dict, List
+
+# Thread pools are sized when numpy/TF load, so this has to run before they are imported
+_cpus = os.cpu_count() or 1
+_workers = max(1, int(os.getenv('SERVE_WORKERS', str(_cpus))))
+_threads_per_worker = max(1, int(os.getenv('SERVE_THREADS_PER_WORKER', str(max(1, _cpus // _workers)))))
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+             'TF_NUM_INTRAOP_THREADS'):
+    os.environ.setdefault(_var, str(_threads_per_worker))
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
+
+backend_dir = os.path.abspath(os.path.dirname(__file__))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import MODEL_MODULES, create_app  # noqa: E402
+from app_logging import get_logger  # noqa: E402
+import metrics  # noqa: E402
+
+log = get_logger('serve')
+
+
+def fork_safe_models() -> List[str]:
+    """Backends that can be imported before fork (no TensorFlow in the process yet)."""
+    models = ['diabetes']
+    if os.getenv('GENERAL_MODEL_BACKEND', 'keras').strip().lower() == 'numpy':
+        models.append('general')
+    return models
+
+
+def preload_shared_resources(models: List[str]) -> Dict[str, float]:
+    """Load read-only artifacts in the master so workers share them copy-on-write."""
+    from general_symptom_based_detection.artifact_store import get_artifact_store
+    from general_symptom_based_detection.disease_knowledge import get_knowledge_base
+    from general_symptom_based_detection.symptom_index import get_symptom_index
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    store = get_artifact_store()
+    store.preload()
+    timings['artifact_store'] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    get_knowledge_base()
+    timings['knowledge_base'] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    get_symptom_index(list(store.model_detail.get('all_symptoms', [])))
+    timings['symptom_index'] = round(time.perf_counter() - started, 4)
+
+    for name in models:
+        started = time.perf_counter()
+        importlib.import_module(MODEL_MODULES[name])
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
+
+
+def _configure_tensorflow_threads() -> None:
+    if 'tensorflow' not in sys.modules:
+        return
+    import tensorflow as tf
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(int(os.environ['TF_NUM_INTRAOP_THREADS']))
+        tf.config.threading.set_inter_op_parallelism_threads(int(os.environ['TF_NUM_INTEROP_THREADS']))
+    except RuntimeError:
+        pass  # already initialized; the env vars applied
+
+
+def _build_worker_app():
+    warm_up_env = os.getenv('WARM_UP_MODELS', 'all').strip()
+    if warm_up_env.lower() == 'all':
+        warm_up = list(MODEL_MODULES)
+    else:
+        warm_up = [m.strip() for m in warm_up_env.split(',') if m.strip()]
+    if any(m not in fork_safe_models() for m in warm_up):
+        import tensorflow  # noqa: F401  (first import happens in the worker)
+        _configure_tensorflow_threads()
+    return create_app(warm_up=warm_up)
+
+
+def run_worker(host: str, port: int, fd: int, threaded: bool, slot: int) -> None:
+    # Let the master decide when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Each worker exposes its own metrics; label them so scrapes can be told apart
+    metrics.REGISTRY.set_const_labels(worker=str(slot), pid=str(os.getpid()))
+    app = _build_worker_app()
+    server = make_server(host, port, app, threaded=threaded, fd=fd)
+    log.info("worker %d accepting on http://%s:%d", os.getpid(), host, port)
+    server.serve_forever()
+
+
+def serve(host: str, port: int, workers: int, threaded: bool = True) -> None:
+    timings = preload_shared_resources(
+        fork_safe_models() if os.getenv('SERVE_PRELOAD_MODELS', 'auto').strip() == 'auto'
+        else [m.strip() for m in os.getenv('SERVE_PRELOAD_MODELS', '').split(',') if m.strip()]
+    )
+    log.info("preloaded before fork (s): %s", timings)
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        # Single process: same server, no fork
+        app = _build_worker_app()
+        log.info("single process on http://%s:%d", host, port)
+        make_server(host, port, app, threaded=threaded).serve_forever()
+        return
+
+    sock = socket.create_server((host, port), backlog=2048, reuse_port=False)
+    sock.set_inheritable(True)
+    fd = sock.fileno()
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(host, port, fd, threaded, slot)
+            finally:
+                os._exit(0)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+    log.info("master %d running %d workers, %d thread(s) each", os.getpid(), workers, _threads_per_worker)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            log.warning("worker %d exited with status %d; restarting", pid, status)
+            time.sleep(1.0)  # don't spin if workers crash on startup
+            spawn(slot)
+    sock.close()
+
+
+if __name__ == '__main__':
+    serve(
+        host=os.getenv('SERVE_HOST', '127.0.0.1'),
+        port=int(os.getenv('SERVE_PORT', '5000')),
+        workers=_workers,
+        threaded=os.getenv('SERVE_THREADED', '1') != '0',
+    )
@@ -0,0 +1,85 @@
+import io
+from typing import BinaryIO, Iterable, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "BMP")
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_PIXELS = 24_000_000
+
+_READ_CHUNK = 64 * 1024
+
+
+class ImageIngestError(ValueError):
+    """Upload rejected; `status_code` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def read_limited(stream: BinaryIO, max_bytes: int = DEFAULT_MAX_BYTES) -> bytes:
+    """Read a stream into memory, refusing anything larger than max_bytes."""
+    buf = bytearray()
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > max_bytes:
+            raise ImageIngestError(f"image larger than {max_bytes} bytes", 413)
+    if not buf:
+        raise ImageIngestError("empty image")
+    return bytes(buf)
+
+
+def decode_image(data: bytes, target_size: Tuple[int, int],
+                 max_pixels: int = DEFAULT_MAX_PIXELS,
+                 allowed_formats: Iterable[str] = ALLOWED_FORMATS) -> np.ndarray:
+    """
+    Decode image bytes to a float32 (height, width, 3) array of `target_size` (height, width).
+
+    Format and dimensions come from the header and are checked before any
+    pixel data is decoded. JPEGs are decoded at reduced scale via draft(),
+    so a large photo never expands to full resolution in memory.
+    """
+    height, width = int(target_size[0]), int(target_size[1])
+    formats = list(allowed_formats)
+    try:
+        img = Image.open(io.BytesIO(data), formats=formats)
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        # Oversized input, not a format problem (the warning only arrives when escalated to an error)
+        raise ImageIngestError(f"image too large: {e}", 413)
+    except Exception:
+        raise ImageIngestError(f"unsupported or corrupt image (allowed: {', '.join(formats)})", 415)
+
+    with img:
+        src_width, src_height = img.size
+        if src_width <= 0 or src_height <= 0:
+            raise ImageIngestError("image has no pixels")
+        if src_width * src_height > max_pixels:
+            raise ImageIngestError(
+                f"image is {src_width}x{src_height}; limit is {max_pixels} pixels", 413
+            )
+
+        # JPEG: let the decoder downscale by 1/2, 1/4 or 1/8 while staying >= target
+        img.draft('RGB', (width, height))
+        try:
+            img = img.convert('RGB')
+            if img.size != (width, height):
+                img = img.resize((width, height), Image.BILINEAR, reducing_gap=2.0)
+        except (Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+            raise ImageIngestError(f"image too large: {e}", 413)
+        except Exception:
+            raise ImageIngestError("could not decode image")
+        return np.asarray(img, dtype=np.float32)
+
+
+def load_image_from_stream(stream: BinaryIO, target_size: Tuple[int, int],
+                           max_bytes: int = DEFAULT_MAX_BYTES,
+                           max_pixels: int = DEFAULT_MAX_PIXELS) -> np.ndarray:
+    """Read an upload stream (size-limited) and decode it for the model."""
+    return decode_image(read_limited(stream, max_bytes), target_size, max_pixels=max_pixels)
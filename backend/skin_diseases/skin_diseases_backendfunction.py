@@ -1,7 +1,16 @@
-import tensorflow as tf
 import numpy as np
-from tensorflow.keras.models import load_model
 import os
+import threading
+import time
+from collections import deque
+
+from PIL import Image
+
+from app_logging import get_logger
+from skin_diseases.image_ingest import decode_image
+from metrics import stage_timer
+
+log = get_logger('skin')
 
 
 class_names=[   
@@ -19,27 +28,181 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 # Use path relative to this file's directory to avoid duplication
 model_path = os.path.join(os.path.dirname(__file__), 'skin_diseases_model.h5')
 
-# Load the model
-model = tf.keras.models.load_model(model_path, compile=False)  # Set compile=False
+# keras (default), or a quantized TFLite variant: tflite-float16 / tflite-int8
+model_backend = os.getenv('SKIN_MODEL_BACKEND', 'keras').strip().lower()
+
+# Load the model; TensorFlow is only imported for the Keras backend
+if model_backend == 'keras':
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path, compile=False)  # Set compile=False
+elif model_backend.startswith('tflite-'):
+    from skin_diseases.tflite_model import load_tflite_model
+    tflite_threads = os.getenv('SKIN_TFLITE_THREADS')
+    model = load_tflite_model(
+        model_backend[len('tflite-'):], h5_path=model_path,
+        num_threads=int(tflite_threads) if tflite_threads else None,
+    )
+else:
+    raise ValueError(f"Unknown SKIN_MODEL_BACKEND: {model_backend}")
+
+# Training resized images to IMAGE_SIZE x IMAGE_SIZE (see skin_diseases_training.ipynb)
+DEFAULT_IMAGE_SIZE = 160
+
+
+def _declared_input_size(model, default=(DEFAULT_IMAGE_SIZE, DEFAULT_IMAGE_SIZE)):
+    """(height, width) from the model's input shape, falling back to the training size."""
+    shape = model.input_shape
+    if isinstance(shape, list):
+        shape = shape[0]
+    height = shape[1] if len(shape) > 2 and shape[1] else default[0]
+    width = shape[2] if len(shape) > 2 and shape[2] else default[1]
+    return int(height), int(width)
+
+
+# (height, width) every image is brought to before inference
+input_size = model.input_size if model_backend != 'keras' else _declared_input_size(model)
+
+
+_stats_lock = threading.Lock()
+_trace_count = 0
+_calls = 0
+_total_seconds = 0.0
+_max_seconds = 0.0
+_recent_latencies = deque(maxlen=1024)
+
+
+def _serve_fn(images):
+    # Python side effects only run while tracing, so this counts (re)compilations
+    global _trace_count
+    with _stats_lock:
+        _trace_count += 1
+    return model(images, training=False)
+
+
+if model_backend == 'keras':
+    # Batch dimension is left open so single images and batches share one graph
+    input_signature = [tf.TensorSpec(shape=(None, input_size[0], input_size[1], 3), dtype=tf.float32, name='images')]
+    serve = tf.function(_serve_fn, input_signature=input_signature)
+else:
+    # The interpreter is already a compiled graph and takes NumPy batches; nothing is ever traced
+    def serve(images):
+        return model.predict(images)
+
+
+def _resize(image):
+    """Bilinear resize of one float (height, width, 3) array, channel by channel in PIL."""
+    height, width = input_size
+    channels = [
+        np.asarray(Image.fromarray(np.ascontiguousarray(image[..., c])).resize((width, height), Image.BILINEAR))
+        for c in range(image.shape[-1])
+    ]
+    return np.stack(channels, axis=-1)
 
-def give_skin_diseases_prediction(img_path):
-    print(f"\n\nLoading image from path: {img_path}")
-    # Load and preprocess the image
-    img = tf.keras.preprocessing.image.load_img(img_path)  # Adjust target_size as per your model's input size
-    img_array = tf.keras.preprocessing.image.img_to_array(img)
-    img_array = tf.expand_dims(img_array, axis=0)  # Add batch dimension
 
+def _to_model_input(img_array):
+    """float32 (batch, height, width, 3) array resized to the model's input size."""
+    images = np.asarray(img_array, dtype=np.float32)
+    if images.ndim == 3:
+        images = images[None, ...]  # Add batch dimension
+    if tuple(images.shape[1:3]) != input_size:
+        images = np.stack([_resize(image) for image in images])
+    return images
+
+
+def run_model(img_array):
+    """Run the compiled forward pass and record its latency; returns a NumPy array of probabilities."""
+    global _calls, _total_seconds, _max_seconds
+    with stage_timer('skin', 'preprocess'):
+        images = _to_model_input(img_array)
+    start = time.perf_counter()
+    with stage_timer('skin', 'forward'):
+        predictions = np.asarray(serve(images))
+    elapsed = time.perf_counter() - start
+    with _stats_lock:
+        _calls += 1
+        _total_seconds += elapsed
+        _max_seconds = max(_max_seconds, elapsed)
+        _recent_latencies.append(elapsed)
+    return predictions
+
+
+def warm_up():
+    """Trace the serving function once so the first request doesn't pay for it."""
+    start = time.perf_counter()
+    serve(np.zeros((1, input_size[0], input_size[1], 3), dtype=np.float32))
+    return time.perf_counter() - start
+
+
+def get_inference_stats():
+    """Trace count and per-call latency of the compiled forward pass."""
+    with _stats_lock:
+        recent = np.array(_recent_latencies) * 1000.0
+        return {
+            "backend": model_backend,
+            "input_size": list(input_size),
+            "trace_count": _trace_count,
+            "calls": _calls,
+            "mean_latency_ms": (_total_seconds / _calls * 1000.0) if _calls else 0.0,
+            "max_latency_ms": _max_seconds * 1000.0,
+            "p50_latency_ms": float(np.percentile(recent, 50)) if recent.size else 0.0,
+            "p95_latency_ms": float(np.percentile(recent, 95)) if recent.size else 0.0,
+            "warm_up_seconds": warm_up_seconds,
+        }
+# {"backend": "keras", "input_size": [160, 160], "trace_count": 1, "calls": 48, "mean_latency_ms": 21.4,
+#  "max_latency_ms": 35.2, "p50_latency_ms": 20.9, "p95_latency_ms": 27.8, "warm_up_seconds": 0.61}
+
+
+warm_up_seconds = warm_up()
+
+
+def give_skin_diseases_prediction_from_array(img_array):
+    """Predict from an already decoded (height, width, 3) image array."""
     # Make predictions
-    predictions = model.predict(img_array)
-    
+    predictions = run_model(img_array)
+
     # Get the predicted class and confidence
     predicted_class = class_names[np.argmax(predictions[0])]
     confidence = np.max(predictions[0])
-    print(f" \n\n\nbackend function Predicted class: {predicted_class}, Confidence: {confidence:.6f}%")
+    log.debug("predicted class: %s, confidence: %.6f", predicted_class, confidence)
 
     return {'predicted_class':predicted_class, 'confidence' :float(confidence)}
 
-# # Example usage 
+
+def give_skin_diseases_prediction(img_path):
+    log.debug("loading image from path: %s", img_path)
+    # Same decode and (bilinear) resize as uploads, so both paths see identical pixels
+    with stage_timer('skin', 'decode'):
+        with open(img_path, 'rb') as f:
+            img_array = decode_image(f.read(), input_size)
+    return give_skin_diseases_prediction_from_array(img_array)
+
+def give_skin_diseases_predictions_batch(img_arrays, top_k=3):
+    """
+    Predict several decoded images with one forward pass.
+
+    Returns one result per image, in order, each with the top `top_k`
+    classes by confidence.
+    """
+    if len(img_arrays) == 0:
+        return []
+    images = np.stack([_to_model_input(img)[0] for img in img_arrays])
+    predictions = run_model(images)
+
+    top_k = max(1, min(int(top_k), len(class_names)))
+    results = []
+    for probs in predictions:
+        order = np.argsort(-probs, kind='stable')[:top_k]
+        results.append({
+            'predicted_class': class_names[order[0]],
+            'confidence': float(probs[order[0]]),
+            'top_k': [{'class': class_names[i], 'confidence': float(probs[i])} for i in order],
+        })
+    log.debug("batch of %d predicted: %s", len(results), results)
+    return results
+# [{'predicted_class': 'Akne', 'confidence': 0.91,
+#   'top_k': [{'class': 'Akne', 'confidence': 0.91}, {'class': 'Pigment', 'confidence': 0.05}, ...]}]
+
+# # Example usage
 # image_path = os.path.join(parent_dir, 'skin_diseases', 'test dataset', 'Akne', 'image_Akne_28.png')
 # result = give_skin_diseases_prediction(model, image_path)
 # print(f"Predicted class: {result['predicted_class']}, Confidence: {result['confidence']}%")
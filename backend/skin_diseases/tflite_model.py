@@ -0,0 +1,280 @@
+"""
+TFLite export and CPU runtime for the skin disease CNN.
+
+Two quantized variants of skin_diseases_model.h5 are produced:
+    float16 - weights stored as float16, compute in float32 (about half the size)
+    int8    - weights and activations in int8, calibrated on images from
+              "test dataset/"; float32 input/output so callers don't change
+
+Usage (from the backend directory):
+    python skin_diseases/tflite_model.py export [float16|int8|all]
+    python skin_diseases/tflite_model.py compare
+"""
+import os
+import sys
+import json
+import time
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+model_dir = os.path.abspath(os.path.dirname(__file__))
+
+default_h5_path = os.path.join(model_dir, 'skin_diseases_model.h5')
+test_dataset_dir = os.path.join(model_dir, 'test dataset')
+default_report_path = os.path.join(model_dir, 'tflite_report.json')
+
+QUANTIZATIONS = ("float16", "int8")
+
+# Training resized images to IMAGE_SIZE x IMAGE_SIZE (see skin_diseases_training.ipynb)
+DEFAULT_IMAGE_SIZE = 160
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def tflite_path(quantization, h5_path=default_h5_path):
+    """skin_diseases_model.h5 -> skin_diseases_model_<quantization>.tflite"""
+    return os.path.splitext(h5_path)[0] + f'_{quantization}.tflite'
+
+
+def _interpreter_class():
+    # The standalone runtimes are much lighter than full TensorFlow when installed
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def _keras_input_size(model):
+    shape = model.input_shape
+    if isinstance(shape, list):
+        shape = shape[0]
+    height = shape[1] if len(shape) > 2 and shape[1] else DEFAULT_IMAGE_SIZE
+    width = shape[2] if len(shape) > 2 and shape[2] else DEFAULT_IMAGE_SIZE
+    return int(height), int(width)
+
+
+def list_test_images(dataset_dir=test_dataset_dir):
+    """[(path, class_name)] for every image; class folders sort the same way training did."""
+    items = []
+    for class_name in sorted(os.listdir(dataset_dir)):
+        class_dir = os.path.join(dataset_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for fname in sorted(os.listdir(class_dir)):
+            if fname.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(class_dir, fname), class_name))
+    return items
+
+
+def load_test_image(path, input_size):
+    """float32 (height, width, 3) array, resized like the serving path."""
+    with Image.open(path) as img:
+        img = img.convert('RGB').resize((input_size[1], input_size[0]), Image.BILINEAR)
+        return np.asarray(img, dtype=np.float32)
+
+
+def representative_dataset(input_size, dataset_dir=test_dataset_dir, limit=120):
+    """
+    Calibration samples for int8 conversion, taken round-robin across the
+    class folders so every class contributes.
+    """
+    by_class = {}
+    for path, class_name in list_test_images(dataset_dir):
+        by_class.setdefault(class_name, []).append(path)
+    queues = [paths for _, paths in sorted(by_class.items())]
+
+    def gen():
+        taken = 0
+        for i in range(max((len(q) for q in queues), default=0)):
+            for paths in queues:
+                if i < len(paths) and taken < limit:
+                    taken += 1
+                    yield [load_test_image(paths[i], input_size)[None, ...]]
+    return gen
+
+
+def export_tflite(quantization, h5_path=default_h5_path, out_path=None):
+    """Convert the Keras model to a quantized .tflite file. Returns the written path."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization} (expected one of {QUANTIZATIONS})")
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(h5_path, compile=False)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        converter.representative_dataset = representative_dataset(_keras_input_size(model))
+        # int8 kernels everywhere they exist; float fallback keeps odd ops convertible
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+        ]
+
+    out_path = out_path or tflite_path(quantization, h5_path)
+    with open(out_path, 'wb') as f:
+        f.write(converter.convert())
+    return out_path
+
+
+class TFLiteModel:
+    """
+    Interpreter wrapper with the same predict(batch) contract as the Keras model.
+
+    An interpreter is not thread-safe, so calls are serialized; the input
+    tensor is resized only when the batch size changes.
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        Interpreter = _interpreter_class()
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        self._lock = threading.Lock()
+
+    @property
+    def input_size(self):
+        shape = self._input['shape']
+        return int(shape[1]), int(shape[2])
+
+    def _quantize(self, x):
+        scale, zero_point = self._input['quantization']
+        dtype = self._input['dtype']
+        if dtype == np.float32 or not scale:
+            return x.astype(dtype)
+        info = np.iinfo(dtype)
+        return np.clip(np.round(x / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, y):
+        scale, zero_point = self._output['quantization']
+        if y.dtype == np.float32 or not scale:
+            return y.astype(np.float32)
+        return (y.astype(np.float32) - zero_point) * scale
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            if x.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], [x.shape[0], *x.shape[1:]])
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+                self._batch_size = x.shape[0]
+            self.interpreter.set_tensor(self._input['index'], self._quantize(x))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output['index']))
+
+
+def load_tflite_model(quantization, h5_path=default_h5_path, num_threads=None, export_missing=False):
+    """
+    Load a quantized variant. The .tflite files are build outputs (not
+    committed): when one is missing, fail with the command that builds it,
+    unless `export_missing` (the CLI) asks to export it here.
+    """
+    path = tflite_path(quantization, h5_path)
+    if not os.path.exists(path):
+        if not export_missing:
+            raise FileNotFoundError(
+                f"{path} not found; build it with `python skin_diseases/tflite_model.py export {quantization}` "
+                f"from the backend directory (needs TensorFlow and {os.path.basename(h5_path)})"
+            )
+        export_tflite(quantization, h5_path, path)
+    return TFLiteModel(path, num_threads=num_threads)
+
+
+def _latency_summary(seconds):
+    ms = np.array(seconds) * 1000.0
+    return {
+        "mean_latency_ms": float(ms.mean()),
+        "p50_latency_ms": float(np.percentile(ms, 50)),
+        "p95_latency_ms": float(np.percentile(ms, 95)),
+    }
+
+
+def compare(h5_path=default_h5_path, quantizations=QUANTIZATIONS, report_path=default_report_path):
+    """
+    Accuracy and single-image latency of Keras vs each TFLite variant on the
+    bundled test images. Variants that are missing are exported first.
+    """
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(h5_path, compile=False)
+    input_size = _keras_input_size(keras_model)
+    items = list_test_images()
+    class_names = sorted({c for _, c in items})
+    labels = np.array([class_names.index(c) for _, c in items])
+    images = np.stack([load_test_image(p, input_size) for p, _ in items])
+
+    def run(predict):
+        predict(images[:1])  # first call pays for setup/tracing
+        outputs, seconds = [], []
+        for img in images:
+            start = time.perf_counter()
+            outputs.append(predict(img[None, ...])[0])
+            seconds.append(time.perf_counter() - start)
+        return np.stack(outputs), seconds
+
+    keras_fn = tf.function(lambda x: keras_model(x, training=False))
+    keras_out, keras_seconds = run(lambda x: keras_fn(tf.constant(x)).numpy())
+    keras_pred = np.argmax(keras_out, axis=1)
+
+    report = {
+        "images": int(len(items)),
+        "input_size": list(input_size),
+        "backends": {
+            "keras": {
+                "file_bytes": os.path.getsize(h5_path),
+                "accuracy": float(np.mean(keras_pred == labels)),
+                **_latency_summary(keras_seconds),
+            }
+        },
+    }
+    for quantization in quantizations:
+        model = load_tflite_model(quantization, h5_path, export_missing=True)
+        out, seconds = run(model.predict)
+        pred = np.argmax(out, axis=1)
+        report["backends"][f"tflite-{quantization}"] = {
+            "file_bytes": os.path.getsize(model.path),
+            "accuracy": float(np.mean(pred == labels)),
+            "agreement_with_keras": float(np.mean(pred == keras_pred)),
+            "max_abs_diff": float(np.max(np.abs(out - keras_out))),
+            **_latency_summary(seconds),
+        }
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=4)
+    return report
+# {
+#     "images": 188,
+#     "input_size": [160, 160],
+#     "backends": {
+#         "keras": {"file_bytes": 9412576, "accuracy": 0.81, "mean_latency_ms": 14.2, ...},
+#         "tflite-float16": {"file_bytes": 1570912, "accuracy": 0.81, "agreement_with_keras": 1.0, ...},
+#         "tflite-int8": {"file_bytes": 812344, "accuracy": 0.8, "agreement_with_keras": 0.98, ...}
+#     }
+# }
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    if command == "export":
+        which = sys.argv[2] if len(sys.argv) > 2 else "all"
+        for quantization in (QUANTIZATIONS if which == "all" else [which]):
+            print(f"Exported {quantization} model to: {export_tflite(quantization)}")
+    elif command == "compare":
+        print(json.dumps(compare(), indent=4))
+    else:
+        print("usage: tflite_model.py [export [float16|int8|all]|compare]")
+        sys.exit(2)
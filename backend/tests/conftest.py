@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Backend modules import each other as top-level packages (as app.py does)
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
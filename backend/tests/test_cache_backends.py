@@ -0,0 +1,269 @@
+"""RedisBackend and NamespacedCache against a local RESP2 stand-in server (user-025)."""
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from cache_backends import NamespacedCache, RedisBackend, artifact_version
+
+
+class _ReusableTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True  # restart() listens on the same port again
+    daemon_threads = True
+
+
+class StubRedisServer:
+    """
+    Just enough RESP2 for RedisBackend: PING, AUTH, SELECT, GET, SET [PX|EX],
+    DEL and DBSIZE; anything else (INFO included) answers -ERR like a minimal
+    server would. One keyspace per db; expiry is checked lazily on access.
+    Records every command and how many connections were accepted.
+    """
+
+    def __init__(self, port=0, password=None):
+        self.password = password
+        self.data = {}
+        self.commands = []
+        self.connections = 0
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._start(port)
+
+    def _start(self, port):
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                    stub._clients.add(self.request)
+                state = {"db": 0, "authed": stub.password is None}
+                try:
+                    while True:
+                        parts = stub._read_command(self.rfile)
+                        if parts is None:
+                            return
+                        self.wfile.write(stub._execute(parts, state))
+                except (OSError, ValueError):
+                    pass  # dropped by drop_connections() or the client
+                finally:
+                    with stub._lock:
+                        stub._clients.discard(self.request)
+
+        self.server = _ReusableTCPServer(('127.0.0.1', port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    @staticmethod
+    def _read_command(reader):
+        line = reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            raise ValueError(f"expected a RESP array, got {line!r}")
+        parts = []
+        for _ in range(int(line[1:-2])):
+            length = int(reader.readline()[1:-2])
+            parts.append(reader.read(length + 2)[:-2])
+        return parts
+
+    def _execute(self, parts, state):
+        name = parts[0].decode().upper()
+        args = parts[1:]
+        with self._lock:
+            self.commands.append(name)
+            if name == 'AUTH':
+                if args[-1].decode() != self.password:
+                    return b'-WRONGPASS invalid password\r\n'
+                state["authed"] = True
+                return b'+OK\r\n'
+            if not state["authed"]:
+                return b'-NOAUTH Authentication required.\r\n'
+            if name == 'PING':
+                return b'+PONG\r\n'
+            if name == 'SELECT':
+                state["db"] = int(args[0])
+                return b'+OK\r\n'
+            db = self.data.setdefault(state["db"], {})
+            now = time.monotonic()
+            for key in [k for k, (_, expires) in db.items() if expires is not None and expires <= now]:
+                del db[key]
+            if name == 'GET':
+                entry = db.get(args[0])
+                return b'$-1\r\n' if entry is None else b'$%d\r\n%s\r\n' % (len(entry[0]), entry[0])
+            if name == 'SET':
+                expires = None
+                if len(args) >= 4 and args[2].upper() == b'PX':
+                    expires = now + int(args[3]) / 1000.0
+                elif len(args) >= 4 and args[2].upper() == b'EX':
+                    expires = now + int(args[3])
+                db[args[0]] = (args[1], expires)
+                return b'+OK\r\n'
+            if name == 'DEL':
+                return b':%d\r\n' % sum(db.pop(k, None) is not None for k in args)
+            if name == 'DBSIZE':
+                return b':%d\r\n' % len(db)
+            return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def drop_connections(self):
+        """Close every client socket, as a server restart or idle timeout would."""
+        with self._lock:
+            clients = list(self._clients)
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.drop_connections()
+
+    def restart(self):
+        """Stop and listen again on the same port with an empty keyspace."""
+        self.stop()
+        self.data = {}
+        self._start(self.port)
+
+
+@pytest.fixture
+def redis_stub():
+    stub = StubRedisServer()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def make_backend():
+    created = []
+
+    def make(url, **kwargs):
+        kwargs.setdefault('timeout_seconds', 2.0)
+        kwargs.setdefault('retry_after_seconds', 0.0)
+        backend = RedisBackend(url, **kwargs)
+        created.append(backend)
+        return backend
+
+    yield make
+    for backend in created:
+        backend._close()
+
+
+def test_get_set_delete_roundtrip(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url)
+
+    assert backend.get('missing') is None
+    backend.set('k', b'\x00binary\r\nvalue')
+    assert backend.get('k') == b'\x00binary\r\nvalue'
+    assert backend.entries() == 1
+
+    backend.delete('k')
+    assert backend.get('k') is None
+    assert backend.entries() == 0
+    assert backend.stats()["errors"] == 0
+    assert redis_stub.connections == 1  # one socket per thread, reused
+
+
+def test_set_with_ttl_expires(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url)
+
+    backend.set('short', b'v', ttl_seconds=0.05)
+    backend.set('long', b'v', ttl_seconds=60)
+    assert backend.get('short') == b'v'
+    time.sleep(0.15)
+    assert backend.get('short') is None
+    assert backend.get('long') == b'v'
+
+
+def test_stats_tolerates_a_server_without_info(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url)
+    backend.set('k', b'v')
+
+    stats = backend.stats()
+    assert stats["backend"] == "redis"
+    assert stats["entries"] == 1
+    assert stats["errors"] == 0
+    assert "INFO" in redis_stub.commands
+
+
+def test_auth_and_select_from_url(make_backend):
+    stub = StubRedisServer(password='s3cret')
+    try:
+        backend = make_backend(f"redis://:s3cret@127.0.0.1:{stub.port}/2")
+        backend.set('k', b'v')
+        assert backend.get('k') == b'v'
+        assert stub.commands[:2] == ['AUTH', 'SELECT']
+        assert b'k' in stub.data[2]
+    finally:
+        stub.stop()
+
+
+def test_reconnects_after_server_drops_connection(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url)
+    backend.set('k', b'v')
+    assert redis_stub.connections == 1
+
+    redis_stub.drop_connections()
+    assert backend.get('k') is None  # the dead socket fails once and is treated as a miss
+    assert backend.stats()["errors"] == 1
+    assert backend.get('k') == b'v'
+    assert redis_stub.connections == 2
+
+
+def test_reconnects_after_server_restart(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url)
+    backend.set('k', b'v')
+
+    redis_stub.stop()
+    assert backend.get('k') is None
+    assert backend.get('k') is None  # refused while the server is down
+    assert backend.stats()["errors"] >= 2
+
+    redis_stub.restart()
+    assert backend.get('k') is None  # a restarted server starts empty
+    backend.set('k', b'v2')
+    assert backend.get('k') == b'v2'
+
+
+def test_backs_off_after_an_error(redis_stub, make_backend):
+    backend = make_backend(redis_stub.url, retry_after_seconds=30.0)
+    backend.set('k', b'v')
+
+    redis_stub.drop_connections()
+    assert backend.get('k') is None
+    connections = redis_stub.connections
+    assert backend.get('k') is None  # skipped without touching the server
+    assert redis_stub.connections == connections
+    assert backend.stats()["errors"] == 1
+
+
+def test_namespaced_keys_follow_artifact_version(redis_stub, make_backend, tmp_path):
+    artifact = tmp_path / "model.bin"
+    artifact.write_bytes(b"weights v1")
+    backend = make_backend(redis_stub.url)
+
+    v1 = artifact_version([str(artifact)])
+    cache = NamespacedCache(backend, 'general.predictions', v1, ttl_seconds=60, codec='json')
+    cache.set('fever,cough', {"prediction": "Flu"})
+    assert cache.get('fever,cough') == {"prediction": "Flu"}
+    assert redis_stub.data[0].keys() == {f"medical:general.predictions:{v1}:fever,cough".encode()}
+
+    artifact.write_bytes(b"weights v2, replaced")
+    v2 = artifact_version([str(artifact)])
+    assert v2 != v1
+    cache.set_version(v2)
+    assert cache.get('fever,cough') is None  # new key space, old entry left to its TTL
+    assert cache.stats()["misses"] == 1
+
+    other = NamespacedCache(backend, 'general.disease_info', v1, codec='json')
+    assert other.get('fever,cough') is None
+    cache.set_version(v1)
+    assert cache.get('fever,cough') == {"prediction": "Flu"}
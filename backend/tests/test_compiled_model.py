@@ -0,0 +1,53 @@
+"""Compiled (NumPy) diabetes model vs the pickled scikit-learn pipeline (user-017)."""
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pd = pytest.importorskip("pandas")
+
+from diabetes import compiled_model  # noqa: E402
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(compiled_model.default_pkl_path), reason="diabetes_model.pkl not present",
+)
+
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    npz_path = str(tmp_path_factory.mktemp("compiled") / "diabetes_model.npz")
+    compiled_model.export_model(compiled_model.default_pkl_path, npz_path)
+    with open(compiled_model.default_pkl_path, 'rb') as f:
+        reference = pickle.load(f)
+    return compiled_model.CompiledDiabetesModel.load(npz_path), reference
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    frame = pd.read_csv(compiled_model.dataset_csv_path)
+    return frame.drop(columns='Outcome').to_numpy(dtype=np.float64)
+
+
+def test_probabilities_equal_on_full_csv(models, dataset):
+    compiled, reference = models
+    np.testing.assert_array_equal(compiled.predict_proba(dataset), reference.predict_proba(dataset))
+
+
+def test_class_labels_equal_on_full_csv(models, dataset):
+    compiled, reference = models
+    np.testing.assert_array_equal(compiled.classes_, reference.classes_)
+    np.testing.assert_array_equal(compiled.predict(dataset), reference.predict(dataset))
+
+
+def test_chunked_scoring_matches_single_pass(models, dataset, monkeypatch):
+    compiled, _ = models
+    expected = compiled.predict_proba(dataset)
+    monkeypatch.setattr(compiled_model, 'EVAL_CHUNK_ROWS', 100)
+    np.testing.assert_array_equal(compiled.predict_proba(dataset), expected)
+
+
+def test_missing_artifact_fails_with_build_instruction(tmp_path):
+    with pytest.raises(FileNotFoundError, match="compiled_model.py export"):
+        compiled_model.load_compiled_model(npz_path=str(tmp_path / "missing.npz"))
@@ -0,0 +1,178 @@
+"""LLMGateway against a local OpenAI-compatible stub server (user-007)."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from general_symptom_based_detection.llm_resource import llm_gateway  # noqa: E402
+from general_symptom_based_detection.llm_resource.llm_gateway import (  # noqa: E402
+    LLMGateway, LLMGatewayError, LLMOverloadedError, LLMTimeoutError,
+)
+
+
+class StubChatServer:
+    """
+    Minimal /chat/completions server. `script` is a list of HTTP statuses
+    answered in order (200 once it runs out); every answer waits `delay`
+    seconds first. Records how many requests were in flight at once.
+    """
+
+    def __init__(self, script=(), delay=0.0):
+        self.script = list(script)
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    status = stub.script.pop(0) if stub.script else 200
+                try:
+                    time.sleep(stub.delay)
+                    if status == 200:
+                        body = {
+                            "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "stub",
+                            "choices": [{"index": 0, "finish_reason": "stop",
+                                         "message": {"role": "assistant", "content": "stub reply"}}],
+                        }
+                    else:
+                        body = {"error": {"message": f"stub status {status}", "type": "stub", "code": None}}
+                    payload = json.dumps(body).encode()
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout tests)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def make_gateway():
+    created = []
+
+    def make(script=(), delay=0.0, **kwargs):
+        stub = StubChatServer(script, delay)
+        kwargs.setdefault('backoff_base_seconds', 0.01)
+        gateway = LLMGateway(api_key="test", base_url=stub.base_url, model="stub", **kwargs)
+        created.append((gateway, stub))
+        return gateway, stub
+
+    yield make
+    for gateway, stub in created:
+        gateway.close()
+        stub.close()
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_reply_text(make_gateway):
+    gateway, stub = make_gateway()
+    assert gateway.complete(MESSAGES) == "stub reply"
+    assert stub.requests == 1
+    assert gateway.stats()["succeeded"] == 1
+
+
+def test_semaphore_caps_requests_in_flight(make_gateway):
+    gateway, stub = make_gateway(delay=0.2, max_concurrency=2, max_pending=10)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        replies = list(pool.map(lambda _: gateway.complete(MESSAGES, timeout=10), range(6)))
+    assert replies == ["stub reply"] * 6
+    assert stub.max_in_flight == 2
+    assert gateway.stats()["in_flight"] == 0
+
+
+def test_calls_beyond_pending_limit_are_rejected(make_gateway):
+    gateway, _ = make_gateway(delay=0.3, max_concurrency=1, max_pending=1)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(gateway.complete, MESSAGES, 10) for _ in range(3)]
+        outcomes = []
+        for f in futures:
+            try:
+                outcomes.append(f.result())
+            except LLMOverloadedError:
+                outcomes.append("rejected")
+    assert outcomes.count("rejected") == 1
+    assert gateway.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_errors_are_retried_with_jittered_backoff(make_gateway, monkeypatch, status):
+    caps = []
+
+    def fake_uniform(low, high):
+        caps.append((low, high))
+        return 0.0
+    monkeypatch.setattr(llm_gateway.random, 'uniform', fake_uniform)
+
+    gateway, stub = make_gateway(script=[status, status], max_retries=2, backoff_base_seconds=0.05)
+    assert gateway.complete(MESSAGES) == "stub reply"
+    assert stub.requests == 3
+    assert gateway.stats()["retries"] == 2
+    # Full jitter: uniform in [0, base * 2^attempt]
+    assert caps == [(0, 0.05), (0, 0.1)]
+
+
+def test_retries_give_up_after_max_retries(make_gateway):
+    gateway, stub = make_gateway(script=[503, 503, 503, 503], max_retries=2)
+    with pytest.raises(LLMGatewayError):
+        gateway.complete(MESSAGES)
+    assert stub.requests == 3
+    assert gateway.stats()["failed"] == 1
+
+
+def test_client_errors_are_not_retried(make_gateway):
+    gateway, stub = make_gateway(script=[400], max_retries=2)
+    with pytest.raises(LLMGatewayError):
+        gateway.complete(MESSAGES)
+    assert stub.requests == 1
+    assert gateway.stats()["retries"] == 0
+
+
+def test_slow_upstream_hits_the_deadline(make_gateway):
+    gateway, _ = make_gateway(delay=2.0)
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        gateway.complete(MESSAGES, timeout=0.3)
+    assert time.monotonic() - started < 1.5
+    stats = gateway.stats()
+    assert stats["timeouts"] == 1 and stats["failed"] == 1
+
+
+def test_waiting_for_a_slot_counts_against_the_deadline(make_gateway):
+    gateway, _ = make_gateway(delay=1.0, max_concurrency=1)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        busy = pool.submit(gateway.complete, MESSAGES, 10)
+        time.sleep(0.2)
+        with pytest.raises(LLMTimeoutError, match="free LLM slot"):
+            gateway.complete(MESSAGES, timeout=0.2)
+        assert busy.result() == "stub reply"
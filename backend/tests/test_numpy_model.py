@@ -0,0 +1,53 @@
+"""NumPy forward pass of the general conditions model vs Keras (user-003)."""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("h5py")
+
+from general_symptom_based_detection import numpy_model  # noqa: E402
+
+ATOL = 1e-5
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(numpy_model.default_h5_path), reason="general_conditions_model.h5 not present",
+)
+
+
+@pytest.fixture(scope="module")
+def test_set():
+    import json
+    with open(numpy_model.test_json_path, 'r') as f:
+        data = json.load(f)
+    return np.array(data["testx"], dtype=np.float32), np.array(data["testy"])
+
+
+@pytest.fixture(scope="module")
+def keras_outputs(test_set):
+    keras_models = pytest.importorskip("tensorflow.keras.models")
+    return keras_models.load_model(numpy_model.default_h5_path).predict(test_set[0], verbose=0)
+
+
+def test_exported_weights_match_keras(tmp_path, test_set, keras_outputs):
+    npz_path = str(tmp_path / "model.npz")
+    numpy_model.export_weights(numpy_model.default_h5_path, npz_path)
+    outputs = numpy_model.NumpyDenseModel.load(npz_path).predict(test_set[0])
+
+    assert outputs.shape == keras_outputs.shape
+    np.testing.assert_allclose(outputs, keras_outputs, rtol=0, atol=ATOL)
+    assert np.array_equal(np.argmax(outputs, axis=1), np.argmax(keras_outputs, axis=1))
+
+
+def test_bundled_npz_matches_keras(test_set, keras_outputs):
+    if not os.path.exists(numpy_model.default_npz_path):
+        pytest.skip("general_conditions_model.npz not present")
+    outputs = numpy_model.NumpyDenseModel.load(numpy_model.default_npz_path).predict(test_set[0])
+    np.testing.assert_allclose(outputs, keras_outputs, rtol=0, atol=ATOL)
+
+
+def test_check_parity_reports_ok():
+    pytest.importorskip("tensorflow")
+    summary = numpy_model.check_parity(atol=ATOL)
+    assert summary["keras_parity"] == "ok", summary
+    assert summary["argmax_agreement"] == 1.0